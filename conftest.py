@@ -1,4 +1,5 @@
 import pytest
+from django.core.cache import cache
 
 
 @pytest.fixture(autouse=True)
@@ -7,7 +8,9 @@ def enable_test_settings(settings):
     Ensure Django knows when we run under pytest.
 
     - Sets settings.TESTING so the application can adjust behaviour
+    - Clears the cache so cached responses never leak between tests
     - Can be extended with other global fixtures later
     """
     settings.TESTING = True
+    cache.clear()
 
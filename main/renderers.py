@@ -0,0 +1,40 @@
+"""
+REST framework renderers for the API.
+"""
+
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is listed in requirements.txt
+    orjson = None
+
+
+_fallback_encoder = encoders.JSONEncoder()
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSON renderer backed by orjson.
+
+    Produces the same payloads as DRF's JSONRenderer for compact responses,
+    but encodes in C. Types orjson does not handle natively (Decimal, lazy
+    translation strings, QuerySets, ...) go through DRF's own JSONEncoder.
+    Indented output (browsable API, `; indent=` media type parameter) and
+    missing orjson fall back to the stock renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        if orjson is None or self.get_indent(accepted_media_type, renderer_context):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        return orjson.dumps(
+            data,
+            default=_fallback_encoder.default,
+            option=orjson.OPT_NON_STR_KEYS,
+        )
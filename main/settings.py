@@ -97,6 +97,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'products.request_cache.RequestCacheMiddleware',  # Per-request memoization of market/currency lookups
 ]
 
 ROOT_URLCONF = 'main.urls'
@@ -137,6 +138,9 @@ if (
     }
 else:
     # PostgreSQL for development/production
+    # Connections are kept open between requests (CONN_MAX_AGE) and checked
+    # before reuse. Behind PgBouncer in transaction pooling mode set
+    # DB_CONN_MAX_AGE=0 and DB_DISABLE_SERVER_SIDE_CURSORS=True.
     DATABASES = {
         'default': {
             'ENGINE': os.getenv('DB_ENGINE', 'django.db.backends.postgresql'),
@@ -145,6 +149,31 @@ else:
             'PASSWORD': os.getenv('DB_PASSWORD', ''),
             'HOST': os.getenv('DB_HOST', 'localhost'),
             'PORT': os.getenv('DB_PORT', '5432'),
+            'CONN_MAX_AGE': int(os.getenv('DB_CONN_MAX_AGE', '60')),
+            'CONN_HEALTH_CHECKS': True,
+            'DISABLE_SERVER_SIDE_CURSORS': os.getenv('DB_DISABLE_SERVER_SIDE_CURSORS', 'False').lower() == 'true',
+        }
+    }
+
+# Cache
+# Use Redis when REDIS_URL is provided (production), otherwise a local-memory cache.
+# Cache invalidation and background task statuses are only visible to every
+# worker through Redis; with the per-process fallback, cached catalogue,
+# currency and fee payloads are capped at a few seconds (products.cache
+# bounded_timeout) and async exchange rate updates are disabled. Set REDIS_URL
+# whenever more than one worker process serves the API.
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         }
     }
 
@@ -201,7 +230,7 @@ REST_FRAMEWORK = {
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 20,
     'DEFAULT_RENDERER_CLASSES': [
-        'rest_framework.renderers.JSONRenderer',
+        'main.renderers.ORJSONRenderer',
         'rest_framework.renderers.BrowsableAPIRenderer',
     ],
     'DEFAULT_PARSER_CLASSES': [
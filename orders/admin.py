@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Sum
 from .models import Order, OrderItem, OrderStatusHistory, Review, ReviewImage
 
 
@@ -24,21 +25,24 @@ class OrderAdmin(admin.ModelAdmin):
     ordering = ('-created_at',)
     readonly_fields = ('order_number', 'market', 'delivery_country', 'card_last_four', 'order_date', 'created_at', 'updated_at', 'items_count', 'is_active', 'can_cancel', 'total_fees', 'net_revenue')
     
+    def get_queryset(self, request):
+        """Total fees and net revenue per order in the list query, not two aggregates per row"""
+        return super().get_queryset(request).annotate(
+            _total_fees=Sum('items__referral_fee_amount'),
+            _net_revenue=Sum('items__store_revenue'),
+        )
+    
     def total_fees(self, obj):
-        """Calculate total referral fees for this order"""
-        from django.db.models import Sum
-        total = obj.items.aggregate(total=Sum('referral_fee_amount'))['total']
-        return total or 0
+        """Total referral fees for this order"""
+        return obj._total_fees or 0
     total_fees.short_description = 'Total Fees'
-    total_fees.admin_order_field = 'items__referral_fee_amount'
+    total_fees.admin_order_field = '_total_fees'
     
     def net_revenue(self, obj):
-        """Calculate net revenue (after fees) for stores in this order"""
-        from django.db.models import Sum
-        total = obj.items.aggregate(total=Sum('store_revenue'))['total']
-        return total or 0
+        """Net revenue (after fees) for stores in this order"""
+        return obj._net_revenue or 0
     net_revenue.short_description = 'Net Revenue (After Fees)'
-    net_revenue.admin_order_field = 'items__store_revenue'
+    net_revenue.admin_order_field = '_net_revenue'
     
     inlines = [OrderItemInline, OrderStatusHistoryInline]
     
@@ -213,6 +213,16 @@ def create_order(request):
         payment_status='pending',
     )
     
+    # Resolve referral fees for every product up front (one query, not one per item)
+    try:
+        from referral_fee.models import ReferralFee
+        referral_fees = ReferralFee.get_fees_for_products(
+            cart_item.sku.product for cart_item in cart_items
+        )
+    except Exception:
+        # If referral_fee app is not available or error occurs, continue without fee
+        referral_fees = {}
+    
     # Create order items from cart items (with converted prices)
     for cart_item in cart_items:
         sku = cart_item.sku
@@ -250,8 +260,7 @@ def create_order(request):
         referral_fee_fixed = Decimal('0.00')
         
         try:
-            from referral_fee.models import ReferralFee
-            referral_fee = ReferralFee.get_fee_for_product(product)
+            referral_fee = referral_fees.get(product.id)
             if referral_fee:
                 referral_fee_amount = referral_fee.calculate_fee(item_subtotal)
                 referral_fee_percentage = referral_fee.fee_percentage
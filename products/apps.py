@@ -6,7 +6,8 @@ class ProductsConfig(AppConfig):
     name = 'products'
     
     def ready(self):
-        """Import admin configuration when app is ready."""
+        """Import admin configuration and signal handlers when app is ready."""
+        import products.signals  # noqa: F401
         try:
             import products.admin_config  # noqa: F401
         except ImportError:
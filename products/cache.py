@@ -0,0 +1,140 @@
+"""
+Response caching helpers for catalogue endpoints.
+
+Catalogue payloads (category lists, category detail) change rarely, so they
+are cached for a short TTL. Keys carry a catalogue version token that is
+rotated by the signal handlers in ``products.signals`` whenever a category,
+subcategory, product, SKU or currency changes, which invalidates every cached
+payload at once without needing backend-specific pattern deletes.
+
+Version rotation only reaches every worker through a shared cache (Redis,
+via REDIS_URL). With the process-local fallback other workers keep their
+copies until they expire, so timeouts are capped (``bounded_timeout``).
+
+The same version token backs the HTTP validators set by
+``conditional_catalog_get``, so browsers and shared caches can revalidate
+catalogue responses with a 304 instead of downloading them again.
+"""
+import hashlib
+import json
+import time
+from functools import wraps
+from uuid import uuid4
+
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import quote_etag
+
+
+LOCAL_CACHE_TIMEOUT_CAP = 10  # seconds; see bounded_timeout()
+
+
+def cache_is_shared():
+    """
+    Whether the default cache is shared between worker processes.
+
+    Process-local backends (local memory, dummy) only see writes made by the
+    same process, so state that another worker must read cannot live there.
+    """
+    return not isinstance(caches["default"], (LocMemCache, DummyCache))
+
+
+def bounded_timeout(seconds):
+    """
+    Cache timeout to use for data invalidated by version rotation.
+
+    Rotating a version only reaches the process that handled the write when
+    the cache is process-local (no REDIS_URL), so other workers keep serving
+    their copies until they expire; capping the timeout bounds that staleness.
+    """
+    return seconds if cache_is_shared() else min(seconds, LOCAL_CACHE_TIMEOUT_CAP)
+
+
+CATALOG_CACHE_TIMEOUT = bounded_timeout(60)  # seconds
+FILTERS_CACHE_TIMEOUT = bounded_timeout(300)  # seconds; facets change slowly
+CURRENCY_CACHE_TIMEOUT = bounded_timeout(900)  # seconds; rates are updated a few times a day
+PRODUCTS_PAGE_CACHE_TIMEOUT = bounded_timeout(45)  # seconds; bounds staleness of ratings/sales counts
+CATALOG_VERSION_KEY = "cat:version"
+HTTP_CACHE_MAX_AGE = 60  # seconds, browsers
+HTTP_CACHE_S_MAXAGE = 300  # seconds, shared caches; also bounds ETag lifetime
+
+
+def _catalog_version():
+    return cache.get_or_set(CATALOG_VERSION_KEY, uuid4().hex, None)
+
+
+def catalog_cache_key(*parts):
+    """
+    Build a versioned cache key for a catalogue payload.
+
+    Example:
+        catalog_cache_key("list", "KG", "api.example.com")
+        # Returns: 'cat:list:KG:api.example.com:<version>'
+    """
+    return ":".join(["cat", *(str(part) for part in parts), _catalog_version()])
+
+
+def request_cache_digest(request):
+    """
+    Stable digest of a request's host, path and query parameters.
+
+    Parameter order does not matter, so `?page=2&sort_by=new` and
+    `?sort_by=new&page=2` share one cache entry.
+    """
+    params = sorted(request.query_params.lists())
+    raw = json.dumps([request.get_host(), request.path, params])
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+
+def invalidate_catalog_cache():
+    """Rotate the catalogue version so all cached payloads are ignored."""
+    cache.set(CATALOG_VERSION_KEY, uuid4().hex, None)
+
+
+def catalog_etag(*parts):
+    """
+    ETag for a catalogue response.
+
+    Changes whenever the catalogue version rotates, and at least every
+    HTTP_CACHE_S_MAXAGE seconds so data that does not rotate the version
+    (reviews, sales counts) is picked up. With a process-local cache each
+    worker has its own version, so the interval is capped like the payload
+    timeouts.
+    """
+    bucket = int(time.time() // bounded_timeout(HTTP_CACHE_S_MAXAGE))
+    key = catalog_cache_key("etag", bucket, *parts)
+    return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
+
+
+def conditional_catalog_get(view_method):
+    """
+    Add ETag/Cache-Control handling to a MarketAwareAPIView GET handler.
+
+    Answers a matching If-None-Match with 304 before running the view, and
+    marks successful responses cacheable: publicly for anonymous requests,
+    privately for authenticated ones (their market comes from the profile).
+    """
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        etag = catalog_etag(self.resolve_market(request), request.build_absolute_uri())
+        not_modified = get_conditional_response(request, etag=quote_etag(etag))
+        response = not_modified or view_method(self, request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response["ETag"] = quote_etag(etag)
+            if request.user and request.user.is_authenticated:
+                patch_cache_control(response, private=True, max_age=HTTP_CACHE_MAX_AGE)
+            else:
+                patch_cache_control(
+                    response,
+                    public=True,
+                    max_age=HTTP_CACHE_MAX_AGE,
+                    s_maxage=HTTP_CACHE_S_MAXAGE,
+                )
+            patch_vary_headers(response, ("Authorization", "X-Market"))
+        return response
+
+    return wrapper
@@ -0,0 +1,113 @@
+"""
+Re-encoding of uploaded product images.
+
+Uploads are downscaled to fit MAX_IMAGE_SIDE and re-encoded as JPEG, or as
+PNG when the image has an alpha channel or a transparency key (so a palette
+image without transparency becomes a JPEG). EXIF orientation is not applied:
+pixels are kept as stored on both encoders. When pyvips (libvips) is installed it
+is used first: libvips shrinks while decoding in a streaming, multi-threaded
+pipeline, which is several times faster than Pillow on large photos and uses
+far less memory. Pillow handles everything libvips cannot, and is the only
+encoder when pyvips is not available.
+"""
+from tempfile import SpooledTemporaryFile
+from typing import NamedTuple
+
+from django.core.files.base import ContentFile, File
+from PIL import Image
+
+try:
+    import pyvips
+except (ImportError, OSError):  # pyvips is optional and needs the libvips system library
+    pyvips = None
+
+
+MAX_IMAGE_SIDE = 2048
+JPEG_QUALITY = 85
+
+
+class EncodedImage(NamedTuple):
+    file: File
+    size: int
+    width: int
+    height: int
+    extension: str
+    content_type: str
+
+
+def encode_upload(upload, max_side: int = MAX_IMAGE_SIDE) -> EncodedImage:
+    """
+    Downscale and re-encode an uploaded image.
+
+    Raises PIL.UnidentifiedImageError or OSError for invalid or unsupported
+    files.
+    """
+    if pyvips is not None:
+        upload.seek(0)
+        try:
+            return _encode_with_vips(upload.read(), max_side)
+        except pyvips.Error:
+            pass  # Let Pillow decide whether the file is usable
+    upload.seek(0)
+    return _encode_with_pillow(upload, max_side)
+
+
+def _encode_with_vips(data: bytes, max_side: int) -> EncodedImage:
+    # no_rotate keeps the pixels as stored, matching the Pillow path
+    image = pyvips.Image.thumbnail_buffer(data, max_side, height=max_side, size="down", no_rotate=True)
+    if image.interpretation not in ("srgb", "b-w"):
+        image = image.colourspace("srgb")
+
+    if image.hasalpha():
+        encoded = image.pngsave_buffer()
+        extension, content_type = ".png", "image/png"
+    else:
+        encoded = image.jpegsave_buffer(Q=JPEG_QUALITY, optimize_coding=True, strip=True)
+        extension, content_type = ".jpg", "image/jpeg"
+
+    return EncodedImage(
+        file=ContentFile(encoded),
+        size=len(encoded),
+        width=image.width,
+        height=image.height,
+        extension=extension,
+        content_type=content_type,
+    )
+
+
+def _encode_with_pillow(upload, max_side: int) -> EncodedImage:
+    # Decoding the pixel data is the validation, so the file is decoded once
+    pil_image = Image.open(upload)
+    # Let libjpeg downscale by a power of two while decoding large JPEGs
+    pil_image.draft(pil_image.mode, (max_side, max_side))
+    pil_image.load()
+
+    # Same rule as libvips: an alpha band, or a transparency key (palette tRNS)
+    has_alpha = pil_image.mode in ("RGBA", "LA", "PA") or "transparency" in pil_image.info
+    if has_alpha and pil_image.mode != "RGBA":
+        pil_image = pil_image.convert("RGBA")
+    elif not has_alpha and pil_image.mode not in ("RGB", "L"):
+        pil_image = pil_image.convert("RGB")
+
+    if max(pil_image.size) > max_side:
+        pil_image.thumbnail((max_side, max_side), Image.LANCZOS)
+
+    # Spools to disk past 2 MB and is handed to storage without copying
+    buffer = SpooledTemporaryFile(max_size=2 * 1024 * 1024)
+    if has_alpha:
+        pil_image.save(buffer, format="PNG")
+        extension, content_type = ".png", "image/png"
+    else:
+        pil_image.save(buffer, format="JPEG", quality=JPEG_QUALITY, optimize=True)
+        extension, content_type = ".jpg", "image/jpeg"
+    size = buffer.tell()
+    buffer.seek(0)
+
+    return EncodedImage(
+        file=File(buffer),
+        size=size,
+        width=pil_image.width,
+        height=pil_image.height,
+        extension=extension,
+        content_type=content_type,
+    )
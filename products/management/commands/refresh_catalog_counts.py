@@ -0,0 +1,24 @@
+"""
+Management command to rebuild denormalized catalogue product counts
+"""
+from django.core.management.base import BaseCommand
+
+from products.cache import invalidate_catalog_cache
+from products.models import Category, Subcategory
+
+
+class Command(BaseCommand):
+    help = 'Recompute product counts for all categories and subcategories (e.g. after bulk imports)'
+
+    def handle(self, *args, **options):
+        category_ids = list(Category.objects.values_list('pk', flat=True))
+        subcategory_ids = list(Subcategory.objects.values_list('pk', flat=True))
+
+        Category.refresh_product_counts(category_ids)
+        Subcategory.refresh_product_counts(subcategory_ids)
+        invalidate_catalog_cache()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Refreshed product counts for {len(category_ids)} categories '
+            f'and {len(subcategory_ids)} subcategories'
+        ))
@@ -0,0 +1,45 @@
+# Generated migration to speed up product search on PostgreSQL
+
+from django.db import migrations
+
+
+# Django's icontains compiles to UPPER("col"::text) LIKE UPPER('%q%'), so the
+# trigram indexes are built on the same expression to be usable by the planner.
+TRIGRAM_INDEXES = [
+    ('products_name_trgm_idx', 'products', 'name'),
+    ('products_description_trgm_idx', 'products', 'description'),
+    ('brands_name_trgm_idx', 'brands', 'name'),
+    ('categories_name_trgm_idx', 'categories', 'name'),
+    ('subcategories_name_trgm_idx', 'subcategories', 'name'),
+    ('skus_sku_code_trgm_idx', 'skus', 'sku_code'),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Enable pg_trgm and create GIN trigram indexes (PostgreSQL only)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm;')
+    for index_name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {index_name} '
+            f'ON {table} USING gin (UPPER({column}::text) gin_trgm_ops);'
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for index_name, _table, _column in TRIGRAM_INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index_name};')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0014_make_store_not_null'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.8
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def market_product_counts(products):
+    return products.filter(is_active=True, in_stock=True).aggregate(
+        product_count_kg=Count('pk', filter=Q(market__in=['KG', 'ALL'])),
+        product_count_us=Count('pk', filter=Q(market__in=['US', 'ALL'])),
+        product_count_all=Count('pk', filter=Q(market='ALL')),
+    )
+
+
+def backfill_product_counts(apps, schema_editor):
+    """Populate the denormalized product counts for existing catalogue rows."""
+    Category = apps.get_model('products', 'Category')
+    Subcategory = apps.get_model('products', 'Subcategory')
+    Product = apps.get_model('products', 'Product')
+
+    for category_id in Category.objects.values_list('pk', flat=True):
+        counts = market_product_counts(Product.objects.filter(category_id=category_id))
+        Category.objects.filter(pk=category_id).update(**counts)
+
+    for subcategory_id in Subcategory.objects.values_list('pk', flat=True):
+        products = Product.objects.filter(
+            Q(subcategory_id=subcategory_id, second_subcategory__isnull=True)
+            | Q(second_subcategory_id=subcategory_id)
+        )
+        Subcategory.objects.filter(pk=subcategory_id).update(**market_product_counts(products))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0015_add_search_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='product_count_kg',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='product_count_us',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='category',
+            name='product_count_all',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subcategory',
+            name='product_count_kg',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subcategory',
+            name='product_count_us',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='subcategory',
+            name='product_count_all',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_product_counts, migrations.RunPython.noop),
+    ]
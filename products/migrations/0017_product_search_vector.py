@@ -0,0 +1,45 @@
+# Generated by Django 5.2.8
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+def create_search_vector_index(apps, schema_editor):
+    """Backfill search vectors and add the GIN index (PostgreSQL only)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        """
+        UPDATE products SET search_vector =
+            setweight(to_tsvector('simple', COALESCE(products.name, '')), 'A')
+            || setweight(to_tsvector('simple', COALESCE((SELECT name FROM brands WHERE brands.id = products.brand_id), '')), 'B')
+            || setweight(to_tsvector('simple', COALESCE((SELECT name FROM categories WHERE categories.id = products.category_id), '')), 'C')
+            || setweight(to_tsvector('simple', COALESCE((SELECT name FROM subcategories WHERE subcategories.id = products.subcategory_id), '')), 'C')
+            || setweight(to_tsvector('simple', COALESCE(products.description, '')), 'D');
+        """
+    )
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS products_search_vector_idx ON products USING gin (search_vector);'
+    )
+
+
+def drop_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS products_search_vector_idx;')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0016_category_subcategory_product_counts'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_vector_index, drop_search_vector_index),
+    ]
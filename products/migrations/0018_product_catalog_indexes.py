@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0017_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(
+                fields=['is_active', 'in_stock', 'market', 'category', 'subcategory', '-sales_count'],
+                name='prod_catalog_idx',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(
+                condition=models.Q(('in_stock', True), ('is_active', True)),
+                fields=['market', 'category', 'subcategory', '-sales_count'],
+                name='prod_catalog_live_idx',
+            ),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8
+
+from django.db import migrations, models
+from django.db.models import Min, OuterRef, Subquery
+
+
+def backfill_min_sku_prices(apps, schema_editor):
+    """Populate the denormalized lowest SKU price for existing products."""
+    Product = apps.get_model('products', 'Product')
+    SKU = apps.get_model('products', 'SKU')
+
+    lowest_price = (
+        SKU.objects.filter(product=OuterRef('pk'))
+        .order_by()
+        .values('product')
+        .annotate(value=Min('price'))
+        .values('value')
+    )
+    Product.objects.update(min_sku_price=Subquery(lowest_price))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0018_product_catalog_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='min_sku_price',
+            field=models.DecimalField(blank=True, decimal_places=2, editable=False, max_digits=10, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(
+                fields=['market', 'is_active', 'in_stock', 'min_sku_price'],
+                name='prod_market_price_idx',
+            ),
+        ),
+        migrations.RunPython(backfill_min_sku_prices, migrations.RunPython.noop),
+    ]
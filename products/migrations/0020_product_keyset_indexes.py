@@ -0,0 +1,25 @@
+# Generated by Django 5.2.8
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0019_product_min_sku_price'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-sales_count', '-id'], name='prod_sales_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-created_at', '-id'], name='prod_newest_keyset_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['-rating', '-sales_count', '-id'], name='prod_rating_keyset_idx'),
+        ),
+    ]
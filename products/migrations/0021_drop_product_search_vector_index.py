@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8
+
+from django.db import migrations
+
+
+def drop_search_vector_index(apps, schema_editor):
+    """Search filters by substring again; the vector is only used for ranking (PostgreSQL only)."""
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS products_search_vector_idx;')
+
+
+def create_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS products_search_vector_idx ON products USING gin (search_vector);'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0020_product_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(drop_search_vector_index, create_search_vector_index),
+    ]
@@ -1,5 +1,6 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
-from django.db.models import Q
+from django.db.models import Count, Min, OuterRef, Q, Subquery
 from django.utils.text import slugify
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
@@ -59,6 +60,41 @@ class Currency(models.Model):
         super().save(*args, **kwargs)
 
 
+PRODUCT_COUNT_FIELDS = {
+    'KG': 'product_count_kg',
+    'US': 'product_count_us',
+}
+
+
+def product_count_field(market):
+    """Name of the denormalized product-count column visible to `market`."""
+    return PRODUCT_COUNT_FIELDS.get(market, 'product_count_all')
+
+
+def grouped_market_product_counts(products, group_field):
+    """
+    Count active, in-stock products per market column for every `group_field` value.
+
+    Runs as one GROUP BY query and returns {group value: counts}; groups
+    without matching products are absent. Products with market='ALL' are
+    visible (and counted) in every market.
+    """
+    rows = (
+        products.filter(is_active=True, in_stock=True)
+        .order_by()
+        .values(group_field)
+        .annotate(
+            product_count_kg=Count('pk', filter=Q(market__in=['KG', 'ALL'])),
+            product_count_us=Count('pk', filter=Q(market__in=['US', 'ALL'])),
+            product_count_all=Count('pk', filter=Q(market='ALL')),
+        )
+    )
+    return {row.pop(group_field): row for row in rows}
+
+
+EMPTY_PRODUCT_COUNTS = {field: 0 for field in ('product_count_kg', 'product_count_us', 'product_count_all')}
+
+
 class Category(models.Model):
     """Product categories"""
     
@@ -77,6 +113,10 @@ class Category(models.Model):
     icon = models.ImageField(upload_to='categories/icons/', null=True, blank=True, help_text="Category icon file (upload icon image)")
     is_active = models.BooleanField(default=True)
     sort_order = models.IntegerField(default=0)
+    # Denormalized product counts, maintained by products.signals
+    product_count_kg = models.IntegerField(default=0, editable=False)
+    product_count_us = models.IntegerField(default=0, editable=False)
+    product_count_all = models.IntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -118,6 +158,16 @@ class Category(models.Model):
             self.slug = slugify(self.name)
         self.full_clean()
         super().save(*args, **kwargs)
+    
+    @classmethod
+    def refresh_product_counts(cls, category_ids):
+        """Recompute denormalized product counts for the given categories."""
+        category_ids = set(category_ids) - {None}
+        counts = grouped_market_product_counts(
+            Product.objects.filter(category_id__in=category_ids), 'category_id'
+        )
+        for category_id in category_ids:
+            cls.objects.filter(pk=category_id).update(**counts.get(category_id, EMPTY_PRODUCT_COUNTS))
 
 
 class Subcategory(models.Model):
@@ -139,6 +189,10 @@ class Subcategory(models.Model):
     image_url = models.URLField(max_length=500, null=True, blank=True)
     is_active = models.BooleanField(default=True)
     sort_order = models.IntegerField(default=0)
+    # Denormalized counts of products assigned directly at this level, maintained by products.signals
+    product_count_kg = models.IntegerField(default=0, editable=False)
+    product_count_us = models.IntegerField(default=0, editable=False)
+    product_count_all = models.IntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
@@ -260,6 +314,29 @@ class Subcategory(models.Model):
     def level(self):
         """Return the level of this subcategory (1 or 2)"""
         return 2 if self.parent_subcategory else 1
+    
+    @classmethod
+    def refresh_product_counts(cls, subcategory_ids):
+        """
+        Recompute denormalized product counts for the given subcategories.
+        
+        First-level subcategories count products without a second_subcategory;
+        second-level subcategories count products assigned to them.
+        """
+        subcategory_ids = set(subcategory_ids) - {None}
+        first_level = grouped_market_product_counts(
+            Product.objects.filter(subcategory_id__in=subcategory_ids, second_subcategory__isnull=True),
+            'subcategory_id',
+        )
+        second_level = grouped_market_product_counts(
+            Product.objects.filter(second_subcategory_id__in=subcategory_ids),
+            'second_subcategory_id',
+        )
+        for subcategory_id in subcategory_ids:
+            first = first_level.get(subcategory_id, EMPTY_PRODUCT_COUNTS)
+            second = second_level.get(subcategory_id, EMPTY_PRODUCT_COUNTS)
+            counts = {field: first[field] + second[field] for field in EMPTY_PRODUCT_COUNTS}
+            cls.objects.filter(pk=subcategory_id).update(**counts)
 
 
 class Brand(models.Model):
@@ -364,6 +441,8 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     original_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     discount = models.IntegerField(default=0, validators=[MinValueValidator(0), MaxValueValidator(100)])  # Percentage
+    # Denormalized lowest SKU price used for price sorting, maintained by products.signals
+    min_sku_price = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, editable=False)
     currency = models.ForeignKey(
         Currency,
         on_delete=models.PROTECT,
@@ -460,6 +539,10 @@ class Product(models.Model):
         help_text="Activities: ['dancing', 'socializing', 'partying']"
     )
     
+    # Full-text search (PostgreSQL): name, brand, category/subcategory and description.
+    # Maintained by products.signals; GIN-indexed by migration 0017.
+    search_vector = SearchVectorField(null=True, editable=False)
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -477,12 +560,42 @@ class Product(models.Model):
             models.Index(fields=['-sales_count']),
             models.Index(fields=['gender', 'market']),  # For AI gender-based filtering
             models.Index(fields=['store', 'is_active']),  # For store filtering
+            # Catalogue listings: active/in-stock/market + category placement, ordered by sales
+            models.Index(
+                fields=['is_active', 'in_stock', 'market', 'category', 'subcategory', '-sales_count'],
+                name='prod_catalog_idx',
+            ),
+            models.Index(
+                fields=['market', 'category', 'subcategory', '-sales_count'],
+                name='prod_catalog_live_idx',
+                condition=Q(is_active=True, in_stock=True),
+            ),
+            models.Index(
+                fields=['market', 'is_active', 'in_stock', 'min_sku_price'],
+                name='prod_market_price_idx',
+            ),
+            # Keyset pagination: sort columns + primary key tiebreaker
+            models.Index(fields=['-sales_count', '-id'], name='prod_sales_keyset_idx'),
+            models.Index(fields=['-created_at', '-id'], name='prod_newest_keyset_idx'),
+            models.Index(fields=['-rating', '-sales_count', '-id'], name='prod_rating_keyset_idx'),
         ]
     
     def __str__(self):
         brand_name = self.brand.name if self.brand else "No Brand"
         return f"{brand_name} - {self.name}"
     
+    @classmethod
+    def refresh_min_sku_prices(cls, product_ids):
+        """Recompute the denormalized lowest SKU price for the given products."""
+        lowest_price = (
+            SKU.objects.filter(product=OuterRef('pk'))
+            .order_by()
+            .values('product')
+            .annotate(value=Min('price'))
+            .values('value')
+        )
+        cls.objects.filter(pk__in=set(product_ids) - {None}).update(min_sku_price=Subquery(lowest_price))
+    
     def get_currency(self):
         """Get currency for this product, falling back to market default"""
         if self.currency:
@@ -623,7 +736,7 @@ class Product(models.Model):
         # Market filter
         if 'market' in query_params:
             market = query_params['market']
-            queryset = queryset.filter(Q(market=market) | Q(market='ALL'))
+            queryset = queryset.filter(market__in=(market, 'ALL'))
         
         # Gender filter
         if 'gender' in query_params:
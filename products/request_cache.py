@@ -0,0 +1,54 @@
+"""
+Request-scoped memoization for market/currency helpers.
+
+Within a single request, helpers such as ``get_market_currency`` are called
+from several views, serializers and pagination code paths with the same
+arguments. ``RequestCacheMiddleware`` opens a fresh cache for each request and
+``request_cached`` serves repeated calls from it, so each distinct call runs
+once per request while currency edits are still picked up by the next request.
+"""
+import contextvars
+from functools import wraps
+
+
+_request_cache = contextvars.ContextVar("products_request_cache", default=None)
+
+
+def request_cached(func):
+    """
+    Memoize ``func`` for the lifetime of the current request.
+
+    Outside a request (management commands, shell, tests without the
+    middleware) the wrapped function is called directly.
+    """
+
+    @wraps(func)
+    def wrapper(*args):
+        cache = _request_cache.get()
+        if cache is None:
+            return func(*args)
+        key = (func.__qualname__, args)
+        try:
+            return cache[key]
+        except KeyError:
+            result = cache[key] = func(*args)
+            return result
+        except TypeError:
+            # Unhashable arguments: skip memoization
+            return func(*args)
+
+    return wrapper
+
+
+class RequestCacheMiddleware:
+    """Open an empty request cache for every request and discard it afterwards."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _request_cache.set({})
+        try:
+            return self.get_response(request)
+        finally:
+            _request_cache.reset(token)
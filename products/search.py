@@ -0,0 +1,94 @@
+"""
+Product search helpers.
+
+Matching is substring-based (``icontains``) on every backend, so partial
+words and SKU fragments match; on PostgreSQL those lookups are served by the
+``pg_trgm`` indexes from migration 0015, with related-table matches written as
+id subqueries. Products also carry a stored ``search_vector`` combining the
+product name, brand, category/subcategory names and description; it is only
+used to rank matches by relevance, and is refreshed by ``products.signals``
+whenever a product or one of the related names changes.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import Exists, F, OuterRef, Q, Subquery
+
+
+SEARCH_CONFIG = "simple"  # Language-agnostic: catalogue mixes Cyrillic and Latin text
+_WORD_RE = re.compile(r"\w+")
+
+
+def uses_search_vector():
+    return connection.vendor == "postgresql"
+
+
+def search_vector_expression():
+    """Weighted tsvector expression computed from a product row and its related names."""
+    from .models import Brand, Category, Subcategory
+
+    def related_name(model, field):
+        return Subquery(model.objects.filter(pk=OuterRef(field)).values("name")[:1])
+
+    return (
+        SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector(related_name(Brand, "brand_id"), weight="B", config=SEARCH_CONFIG)
+        + SearchVector(related_name(Category, "category_id"), weight="C", config=SEARCH_CONFIG)
+        + SearchVector(related_name(Subcategory, "subcategory_id"), weight="C", config=SEARCH_CONFIG)
+        + SearchVector("description", weight="D", config=SEARCH_CONFIG)
+    )
+
+
+def update_search_vectors(queryset):
+    """Recompute the stored search vector for every product in `queryset`."""
+    if uses_search_vector():
+        queryset.update(search_vector=search_vector_expression())
+
+
+def prefix_search_query(query):
+    """Word-prefix tsquery for `query` (every word must match), or None without words."""
+    words = _WORD_RE.findall(query)
+    if not words:
+        return None
+    prefix_query = " & ".join(f"{word}:*" for word in words)
+    return SearchQuery(prefix_query, search_type="raw", config=SEARCH_CONFIG)
+
+
+def search_rank_expression(query):
+    """
+    Weighted rank of the stored search vector against `query`.
+
+    Returns None when ranking is unavailable (non-PostgreSQL databases or a
+    query without words).
+    """
+    if not uses_search_vector():
+        return None
+    search_query = prefix_search_query(query)
+    if search_query is None:
+        return None
+    return SearchRank(F("search_vector"), search_query)
+
+
+def product_search_filter(query):
+    """
+    Build the filter matching products for a (NFKC-normalized) search query.
+
+    Substring matches on name, description, SKU code and the brand/category/
+    subcategory names, on every backend.
+    """
+    from .models import SKU, Brand, Category, Subcategory
+
+    # Exact and partial SKU matches
+    sku_match = Q(Exists(SKU.objects.filter(product=OuterRef("pk"), sku_code__icontains=query)))
+
+    # Related-table matches are expressed as id subqueries rather than JOINs so
+    # each branch can use its own index and the SKU branch does not fan out rows.
+    return (
+        Q(name__icontains=query)
+        | Q(description__icontains=query)
+        | Q(brand__in=Brand.objects.filter(name__icontains=query).values("pk"))
+        | Q(category__in=Category.objects.filter(name__icontains=query).values("pk"))
+        | Q(subcategory__in=Subcategory.objects.filter(name__icontains=query).values("pk"))
+        | sku_match
+    )
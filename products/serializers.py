@@ -522,6 +522,10 @@ class ProductListSerializer(ProductSerializerMixin, serializers.ModelSerializer)
 
     def get_rating_avg(self, obj: Product) -> float:
         """Calculate average rating from approved reviews"""
+        if hasattr(obj, "approved_rating_avg"):
+            # Annotated by MarketAwareAPIView.listing_queryset
+            return float(obj.approved_rating_avg or 0.0)
+
         from django.db.models import Avg
         from orders.models import Review  # pyright: ignore[reportMissingImports]
         
@@ -534,6 +538,9 @@ class ProductListSerializer(ProductSerializerMixin, serializers.ModelSerializer)
     
     def get_rating_count(self, obj: Product) -> int:
         """Count approved reviews"""
+        if hasattr(obj, "approved_rating_count"):
+            return obj.approved_rating_count or 0
+
         from orders.models import Review  # pyright: ignore[reportMissingImports]
         
         return Review.objects.filter(
@@ -543,6 +550,9 @@ class ProductListSerializer(ProductSerializerMixin, serializers.ModelSerializer)
     
     def get_sold_count(self, obj: Product) -> int:
         """Calculate total quantity sold from delivered orders"""
+        if hasattr(obj, "delivered_sold_count"):
+            return int(obj.delivered_sold_count or 0)
+
         from django.db.models import Sum
         from orders.models import OrderItem  # pyright: ignore[reportMissingImports]
         
@@ -900,9 +910,9 @@ class CartSerializer(serializers.ModelSerializer):
 
     def get_items(self, obj: Cart) -> List[Dict]:
         serializer = CartItemSerializer(
-            obj.items.select_related("sku", "sku__product").prefetch_related(
-                "sku__product__images"
-            ),
+            obj.items.select_related(
+                "sku__product__brand", "sku__size_option", "sku__color_option"
+            ).prefetch_related("sku__product__images"),
             many=True,
             context=self.context,
         )
@@ -947,7 +957,12 @@ class WishlistSerializer(serializers.ModelSerializer):
 
     def get_items(self, obj: Wishlist) -> List[Dict]:
         serializer = WishlistItemSerializer(
-            obj.items.select_related("product")
+            obj.items.select_related(
+                "product__brand",
+                "product__category",
+                "product__subcategory",
+                "product__second_subcategory",
+            )
             .prefetch_related("product__images", "product__skus"),
             many=True,
             context=self.context,
@@ -1089,6 +1104,7 @@ class SubcategoryProductsResponseSerializer(serializers.Serializer):
     limit = serializers.IntegerField()
     total_pages = serializers.IntegerField()
     has_more = serializers.BooleanField()
+    next_cursor = serializers.CharField(allow_null=True)
     currency = MarketCurrencySerializer(read_only=True)
 
 
@@ -1096,11 +1112,12 @@ class ProductSearchResponseSerializer(serializers.Serializer):
     """Serializer for search endpoint responses."""
 
     products = ProductListSerializer(many=True, read_only=True)
-    total = serializers.IntegerField()
+    total = serializers.IntegerField(allow_null=True)
     page = serializers.IntegerField()
     limit = serializers.IntegerField()
-    total_pages = serializers.IntegerField()
+    total_pages = serializers.IntegerField(allow_null=True)
     has_more = serializers.BooleanField()
+    next_cursor = serializers.CharField(allow_null=True)
     currency = MarketCurrencySerializer(read_only=True)
 
 
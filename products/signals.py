@@ -0,0 +1,73 @@
+"""
+Signal handlers for the products app.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import invalidate_catalog_cache
+from .models import SKU, Brand, Category, Currency, Product, Subcategory
+from .search import update_search_vectors
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Subcategory)
+@receiver(post_delete, sender=Subcategory)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=SKU)
+@receiver(post_delete, sender=SKU)
+@receiver(post_save, sender=Currency)
+@receiver(post_delete, sender=Currency)
+def invalidate_catalog_on_change(sender, **kwargs):
+    """Drop cached catalogue payloads (and HTTP validators) when the catalogue changes."""
+    invalidate_catalog_cache()
+
+
+@receiver(pre_save, sender=Product)
+def remember_product_catalog_placement(sender, instance, **kwargs):
+    """Keep the pre-save category/subcategory ids so moved products refresh both sides."""
+    instance._previous_catalog_ids = (
+        Product.objects.filter(pk=instance.pk)
+        .values_list("category_id", "subcategory_id", "second_subcategory_id")
+        .first()
+        if instance.pk
+        else None
+    ) or (None, None, None)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def refresh_catalog_product_counts(sender, instance, **kwargs):
+    """Keep Category/Subcategory denormalized product counts in sync."""
+    previous_category_id, *previous_subcategory_ids = getattr(
+        instance, "_previous_catalog_ids", (None, None, None)
+    )
+    Category.refresh_product_counts([instance.category_id, previous_category_id])
+    Subcategory.refresh_product_counts(
+        [instance.subcategory_id, instance.second_subcategory_id, *previous_subcategory_ids]
+    )
+
+
+@receiver(post_save, sender=SKU)
+@receiver(post_delete, sender=SKU)
+def refresh_product_min_sku_price(sender, instance, **kwargs):
+    """Keep Product.min_sku_price in sync with the product's SKU prices."""
+    Product.refresh_min_sku_prices([instance.product_id])
+
+
+@receiver(post_save, sender=Product)
+def refresh_product_search_vector(sender, instance, **kwargs):
+    """Recompute the stored search vector of a saved product."""
+    update_search_vectors(Product.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Brand)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Subcategory)
+def refresh_related_search_vectors(sender, instance, created, **kwargs):
+    """Brand/category/subcategory names are part of the product search vector."""
+    if created:
+        return
+    related_field = {Brand: "brand", Category: "category", Subcategory: "subcategory"}[sender]
+    update_search_vectors(Product.objects.filter(**{related_field: instance}))
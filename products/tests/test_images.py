@@ -0,0 +1,79 @@
+"""
+Tests for products.images upload re-encoding.
+"""
+
+import io
+from unittest import skipIf
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase
+from PIL import Image
+
+from products import images
+
+
+def _upload(image, name="upload.png", **save_kwargs):
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", **save_kwargs)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+def _palette_image(transparent):
+    image = Image.new("RGB", (40, 20), (200, 30, 30)).convert("P")
+    save_kwargs = {"transparency": 0} if transparent else {}
+    return image, save_kwargs
+
+
+class EncodeUploadTestsMixin:
+    """Shared expectations; subclasses pin which encoder encode_upload uses."""
+
+    def encode(self, upload, **kwargs):
+        raise NotImplementedError
+
+    def test_opaque_image_becomes_jpeg(self):
+        result = self.encode(_upload(Image.new("RGB", (40, 20), "white")))
+        self.assertEqual((result.extension, result.content_type), (".jpg", "image/jpeg"))
+        self.assertEqual((result.width, result.height), (40, 20))
+
+    def test_rgba_image_stays_png(self):
+        result = self.encode(_upload(Image.new("RGBA", (40, 20), (0, 0, 0, 0))))
+        self.assertEqual((result.extension, result.content_type), (".png", "image/png"))
+
+    def test_palette_image_without_transparency_becomes_jpeg(self):
+        image, save_kwargs = _palette_image(transparent=False)
+        result = self.encode(_upload(image, **save_kwargs))
+        self.assertEqual(result.extension, ".jpg")
+
+    def test_palette_image_with_transparency_stays_png(self):
+        image, save_kwargs = _palette_image(transparent=True)
+        result = self.encode(_upload(image, **save_kwargs))
+        self.assertEqual(result.extension, ".png")
+
+    def test_large_image_is_downscaled(self):
+        result = self.encode(_upload(Image.new("RGB", (400, 100), "white")), max_side=100)
+        self.assertEqual((result.width, result.height), (100, 25))
+
+    def test_exif_orientation_is_not_applied(self):
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotate 90 CW on display
+        buffer = io.BytesIO()
+        Image.new("RGB", (40, 20), "white").save(buffer, format="JPEG", exif=exif.tobytes())
+        upload = SimpleUploadedFile("photo.jpg", buffer.getvalue(), content_type="image/jpeg")
+
+        result = self.encode(upload)
+        self.assertEqual((result.width, result.height), (40, 20))
+
+
+class PillowEncodeUploadTests(EncodeUploadTestsMixin, SimpleTestCase):
+    def encode(self, upload, **kwargs):
+        with patch.object(images, "pyvips", None):
+            return images.encode_upload(upload, **kwargs)
+
+
+@skipIf(images.pyvips is None, "pyvips/libvips is not installed")
+class VipsEncodeUploadTests(EncodeUploadTestsMixin, SimpleTestCase):
+    def encode(self, upload, **kwargs):
+        # Fail instead of silently falling back to Pillow
+        with patch.object(images, "_encode_with_pillow", side_effect=AssertionError("Pillow fallback used")):
+            return images.encode_upload(upload, **kwargs)
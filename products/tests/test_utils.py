@@ -0,0 +1,62 @@
+"""
+Tests for products.utils helpers.
+"""
+
+from django.test import TestCase
+
+from products.models import Currency
+from products.request_cache import RequestCacheMiddleware
+from products.utils import convert_currency, get_market_currency
+
+
+class ConvertCurrencyTests(TestCase):
+    """convert_currency should use a single rates lookup and no base branching."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Currency.objects.create(code='USD', name='US Dollar', symbol='$', exchange_rate=1.0, is_base=True)
+        Currency.objects.create(code='KGS', name='Kyrgyzstani Som', symbol='сом', exchange_rate=89.5)
+        Currency.objects.create(code='EUR', name='Euro', symbol='€', exchange_rate=0.5)
+
+    def test_same_currency_returns_amount_without_queries(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(convert_currency(100, 'USD', 'USD'), 100)
+
+    def test_base_to_other(self):
+        self.assertAlmostEqual(convert_currency(100, 'USD', 'KGS'), 8950.0)
+
+    def test_other_to_base(self):
+        self.assertAlmostEqual(convert_currency(8950, 'KGS', 'USD'), 100.0)
+
+    def test_cross_rate_through_base(self):
+        with self.assertNumQueries(1):
+            self.assertAlmostEqual(convert_currency(50, 'EUR', 'KGS'), 8950.0)
+
+    def test_unknown_currency_returns_original_amount(self):
+        self.assertEqual(convert_currency(100, 'USD', 'XXX'), 100)
+
+
+class RequestCacheTests(TestCase):
+    """Market currency lookups should run once per request."""
+
+    @classmethod
+    def setUpTestData(cls):
+        Currency.objects.create(code='USD', name='US Dollar', symbol='$', exchange_rate=1.0, is_base=True)
+        Currency.objects.create(code='KGS', name='Kyrgyzstani Som', symbol='сом', exchange_rate=89.5)
+
+    def test_get_market_currency_memoized_within_request(self):
+        def view(request):
+            get_market_currency('KG')
+            get_market_currency('KG')
+            convert_currency(1, 'USD', 'KGS')
+            return convert_currency(2, 'USD', 'KGS')
+
+        with self.assertNumQueries(2):
+            result = RequestCacheMiddleware(view)(None)
+        self.assertAlmostEqual(result, 179.0)
+
+    def test_cache_not_shared_between_requests(self):
+        middleware = RequestCacheMiddleware(lambda request: get_market_currency('US'))
+        middleware(None)
+        Currency.objects.filter(code='USD').update(symbol='US$')
+        self.assertEqual(middleware(None)['symbol'], 'US$')
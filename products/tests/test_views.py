@@ -3,7 +3,9 @@ Integration tests for products API endpoints.
 """
 
 from decimal import Decimal
+from unittest.mock import patch
 
+from django.core.cache import cache
 from django.core.files.storage import default_storage
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
@@ -244,6 +246,8 @@ class ProductAPIViewTests(TestCase):
         cls.sku2 = SKU.objects.filter(product=cls.product_second, sku_code="SPORT-L-RED").first()
 
     def setUp(self):
+        # Cached catalogue payloads outlive the per-test transaction rollback
+        cache.clear()
         self.client = APIClient()
 
     def test_products_list_returns_active_products(self):
@@ -253,6 +257,8 @@ class ProductAPIViewTests(TestCase):
         self.assertEqual(len(response.data), 2)
         self.assertEqual(response["X-Total-Count"], "2")  # type: ignore
         self.assertEqual(response.data[0]["title"], "Футболка MARQUE")
+        self.assertEqual(response.data[0]["rating_count"], 0)
+        self.assertEqual(response.data[0]["sold_count"], 0)
 
     def test_products_best_sellers_endpoint(self):
         """GET /api/v1/products/best-sellers should return only best seller products."""
@@ -313,6 +319,68 @@ class ProductAPIViewTests(TestCase):
         self.assertEqual(slug_map["t-shirts"]["product_count"], 2)
         self.assertEqual(slug_map["jeans"]["product_count"], 0)
 
+    def test_denormalized_product_counts_follow_product_changes(self):
+        """Category/subcategory product counts should be kept in sync on product save/delete."""
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.product_count_kg, 2)
+        self.assertEqual(self.category.product_count_us, 0)
+
+        self.product_second.in_stock = False
+        self.product_second.save()
+        self.category.refresh_from_db()
+        self.subcategory.refresh_from_db()
+        self.assertEqual(self.category.product_count_kg, 1)
+        self.assertEqual(self.subcategory.product_count_kg, 1)
+
+        self.product.market = "ALL"
+        self.product.save()
+        self.category.refresh_from_db()
+        self.assertEqual(self.category.product_count_us, 1)
+        self.assertEqual(self.category.product_count_all, 1)
+
+    def test_min_sku_price_follows_sku_changes(self):
+        """Product.min_sku_price should track the lowest SKU price for price sorting."""
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.min_sku_price, Decimal("2300.00"))
+
+        self.sku1.price = Decimal("3500.00")
+        self.sku1.save()
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.min_sku_price, Decimal("2600.00"))
+
+        response = self.client.get("/api/v1/products/search", {"sort_by": "price_desc"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item["slug"] for item in response.data["products"]],
+            ["sport-tee", "marque-tee"],
+        )
+
+    def test_categories_list_is_cached_until_catalog_changes(self):
+        """Repeated category list requests should be served from cache until a category changes."""
+        self.client.get("/api/v1/categories")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/v1/categories")
+        self.assertEqual(response.data["total"], 1)
+
+        Category.objects.create(name="Женщинам", slug="women", market="KG", is_active=True)
+        response = self.client.get("/api/v1/categories")
+        self.assertEqual(response.data["total"], 2)
+
+    def test_catalog_responses_support_conditional_get(self):
+        """Catalogue GETs should carry an ETag and answer a matching If-None-Match with 304."""
+        response = self.client.get("/api/v1/products/marque-tee")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("public", response["Cache-Control"])
+        etag = response["ETag"]
+
+        response = self.client.get("/api/v1/products/marque-tee", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.sku1.price = Decimal("2400.00")
+        self.sku1.save()
+        response = self.client.get("/api/v1/products/marque-tee", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
     def test_category_subcategory_products_endpoint(self):
         """Products endpoint scoped by category and subcategory should include filter metadata."""
         response = self.client.get(
@@ -332,6 +400,96 @@ class ProductAPIViewTests(TestCase):
         sizes = response.data["products"][0]["available_sizes"]
         self.assertIn("S", sizes)
 
+    def test_subcategory_products_page_is_cached(self):
+        """Repeated listing requests should be served from cache until the catalogue changes."""
+        url = "/api/v1/categories/men/subcategories/t-shirts/products"
+        response = self.client.get(url, {"sort_by": "price_desc", "sizes": "S"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(url, {"sizes": "S", "sort_by": "price_desc"})
+        self.assertEqual(cached.data, response.data)
+
+        self.product.name = "Футболка MARQUE обновлённая"
+        self.product.save()
+        response = self.client.get(url, {"sort_by": "price_desc", "sizes": "S"})
+        titles = [item["title"] for item in response.data["products"]]
+        self.assertIn("Футболка MARQUE обновлённая", titles)
+
+    def test_currency_list_is_cached_until_rates_change(self):
+        """Currency payloads should be cached and refreshed when a currency is saved."""
+        response = self.client.get("/api/v1/currencies")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertNumQueries(0):
+            self.client.get("/api/v1/currencies")
+
+        self.currency_us.exchange_rate = Decimal("90.00")
+        self.currency_us.save()
+        response = self.client.get("/api/v1/currencies")
+        rates = {item["code"]: item["exchange_rate"] for item in response.data}
+        self.assertEqual(Decimal(str(rates["USD"])), Decimal("90.00"))
+
+    def test_subcategory_products_keyset_pagination(self):
+        """`next_cursor` should page through a listing without repeating products."""
+        url = "/api/v1/categories/men/subcategories/t-shirts/products"
+        first = self.client.get(url, {"sort_by": "popular", "limit": 1})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["slug"] for item in first.data["products"]], ["marque-tee"])
+        self.assertTrue(first.data["has_more"])
+
+        second = self.client.get(
+            url, {"sort_by": "popular", "limit": 1, "after": first.data["next_cursor"]}
+        )
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["slug"] for item in second.data["products"]], ["sport-tee"])
+        self.assertEqual(second.data["total"], 2)
+        self.assertFalse(second.data["has_more"])
+        self.assertIsNone(second.data["next_cursor"])
+
+        invalid = self.client.get(url, {"sort_by": "popular", "after": "not-a-cursor"})
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_product_search_keyset_pagination(self):
+        """Search results sorted by a column should page with `next_cursor` too."""
+        first = self.client.get("/api/v1/products/search", {"sort_by": "popular", "limit": 1})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        self.assertEqual([item["slug"] for item in first.data["products"]], ["marque-tee"])
+        self.assertIsNotNone(first.data["next_cursor"])
+
+        second = self.client.get(
+            "/api/v1/products/search",
+            {"sort_by": "popular", "limit": 1, "after": first.data["next_cursor"]},
+        )
+        self.assertEqual([item["slug"] for item in second.data["products"]], ["sport-tee"])
+        self.assertFalse(second.data["has_more"])
+        self.assertIsNone(second.data["next_cursor"])
+
+    def test_with_count_zero_skips_totals(self):
+        """`?with_count=0` should drop totals but still report `has_more`."""
+        response = self.client.get("/api/v1/products", {"with_count": "0"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+        self.assertNotIn("X-Total-Count", response)
+
+        response = self.client.get(
+            "/api/v1/products/search", {"sort_by": "popular", "limit": 1, "with_count": "0"}
+        )
+        self.assertIsNone(response.data["total"])
+        self.assertIsNone(response.data["total_pages"])
+        self.assertTrue(response.data["has_more"])
+
+    def test_attribute_filters_require_a_single_matching_sku(self):
+        """Size and color filters should match the same SKU, without duplicate rows."""
+        url = "/api/v1/categories/men/subcategories/t-shirts/products"
+        response = self.client.get(url, {"sizes": "S,M", "colors": "black,white"})
+        self.assertEqual(response.data["total"], 1)
+        self.assertEqual(len(response.data["products"]), 1)
+
+        # MARQUE tee has S/black and M/white variants, but no S/white SKU
+        response = self.client.get(url, {"sizes": "S", "colors": "white"})
+        self.assertEqual(response.data["total"], 0)
+
     def test_subcategory_products_legacy_endpoint(self):
         """Legacy endpoint without category slug should still resolve products."""
         response = self.client.get("/api/v1/subcategories/t-shirts/products")
@@ -444,6 +602,24 @@ class ProductAPIViewTests(TestCase):
         self.assertEqual(response.data["items"], [])
         self.assertEqual(response.data["total_price"], 0.0)
 
+    def test_cart_minimal_responses(self):
+        """`?minimal=1` mutations should return totals and the affected item only."""
+        payload = {"user_id": self.user.id, "sku_id": self.sku1.id, "quantity": 2}
+        self.client.post("/api/v1/cart/add?minimal=1", payload, format="json")
+        response = self.client.post("/api/v1/cart/add?minimal=1", payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("items", response.data)
+        self.assertEqual(response.data["quantity"], 4)
+        self.assertEqual(response.data["total_items"], 4)
+        self.assertAlmostEqual(response.data["total_price"], float(self.sku1.price) * 4)
+
+        response = self.client.post(
+            "/api/v1/cart/clear?minimal=1", {"user_id": self.user.id}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_items"], 0)
+        self.assertEqual(response.data["total_price"], 0.0)
+
     def test_cart_clear_endpoint(self):
         """Clear endpoint should remove all items."""
         self.client.post(
@@ -462,6 +638,7 @@ class ProductAPIViewTests(TestCase):
             format="json",
         )
         self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["user_id"], self.user.id)
         self.assertEqual(response.data["total_items"], 0)
         self.assertEqual(response.data["items"], [])
         self.assertEqual(response.data["total_price"], 0.0)
@@ -481,6 +658,15 @@ class ProductAPIViewTests(TestCase):
         self.assertIn("price_min", wishlist_item["product"])
         self.assertIn("available_sizes", wishlist_item["product"])
 
+        # Adding the same product again is a no-op
+        response = self.client.post(
+            "/api/v1/wishlist/add",
+            {"user_id": self.user.id, "product_id": self.product.id},
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["items"]), 1)
+
         response = self.client.post(
             "/api/v1/wishlist/remove",
             {"user_id": self.user.id, "product_id": self.product.id},
@@ -489,6 +675,19 @@ class ProductAPIViewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data["items"]), 0)
 
+    def test_wishlist_minimal_responses(self):
+        """`?minimal=1` wishlist mutations should return the wishlist size only."""
+        payload = {"user_id": self.user.id, "product_id": self.product.id}
+        response = self.client.post("/api/v1/wishlist/add?minimal=1", payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("items", response.data)
+        self.assertTrue(response.data["in_wishlist"])
+        self.assertEqual(response.data["total_items"], 1)
+
+        response = self.client.post("/api/v1/wishlist/remove?minimal=1", payload, format="json")
+        self.assertFalse(response.data["in_wishlist"])
+        self.assertEqual(response.data["total_items"], 0)
+
     def test_wishlist_clear(self):
         """Clearing wishlist should return success and empty items."""
         self.client.post(
@@ -535,3 +734,67 @@ class ProductAPIViewTests(TestCase):
         )
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
 
+
+class CurrencyUpdateRatesViewTests(TestCase):
+    """Exchange rate update endpoint: inline by default, background with ?async=1."""
+
+    RESULT = {
+        "success": True,
+        "message": "Exchange rates updated successfully",
+        "updated_count": 3,
+        "output": "Successfully updated 3 currency exchange rate(s)",
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            phone="+996555999998",
+            password="admin123",
+            location="KG",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.admin)
+
+    @patch("products.views_currency.run_rate_update", return_value=RESULT)
+    def test_update_runs_inline_by_default(self, run_rate_update):
+        response = self.client.post("/api/v1/currencies/update-rates?force=true")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["updated_count"], 3)
+        run_rate_update.assert_called_once_with("exchangerate", True)
+
+    @patch("products.views_currency.run_rate_update")
+    def test_async_update_requires_shared_cache(self, run_rate_update):
+        response = self.client.post("/api/v1/currencies/update-rates?async=1")
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        run_rate_update.assert_not_called()
+
+    @patch("products.views_currency.connections")
+    @patch("products.views_currency.run_rate_update", return_value=RESULT)
+    @patch("products.views_currency.cache_is_shared", return_value=True)
+    def test_async_update_reports_status(self, cache_is_shared, run_rate_update, connections):
+        with patch("products.views_currency.threading.Thread") as thread:
+            response = self.client.post("/api/v1/currencies/update-rates?async=1")
+
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        task_id = response.data["task_id"]
+        status_url = f"/api/v1/currencies/update-rates/{task_id}"
+        self.assertEqual(self.client.get(status_url).data["status"], "queued")
+
+        # Run the background job the view handed to its thread
+        thread.return_value.start.assert_called_once()
+        target = thread.call_args.kwargs["target"]
+        target(*thread.call_args.kwargs["args"])
+
+        response = self.client.get(status_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["status"], "finished")
+        self.assertEqual(response.data["updated_count"], 3)
+
+    def test_unknown_task_id_is_not_found(self):
+        response = self.client.get(f"/api/v1/currencies/update-rates/{'0' * 32}")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
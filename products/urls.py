@@ -2,7 +2,7 @@
 URL patterns for the products app.
 """
 
-from django.urls import path, re_path
+from django.urls import re_path
 
 from .views import (
     CategoryDetailView,
@@ -26,7 +26,13 @@ from .views import (
     WishlistGetView,
     WishlistRemoveView,
 )
-from .views_currency import CurrencyListView, CurrencyConvertView, MarketCurrencyView, CurrencyUpdateRatesView
+from .views_currency import (
+    CurrencyListView,
+    CurrencyConvertView,
+    MarketCurrencyView,
+    CurrencyUpdateRatesView,
+    CurrencyUpdateRatesStatusView,
+)
 
 urlpatterns = [
     # Category endpoints
@@ -62,8 +68,7 @@ urlpatterns = [
     re_path(r"^products/search/?$", ProductSearchView.as_view(), name="product-search"),
 
     # Detail endpoint (slug or numeric ID)
-    path("products/<str:identifier>", ProductDetailView.as_view(), name="product-detail"),
-    path("products/<str:identifier>/", ProductDetailView.as_view(), name="product-detail-slash"),
+    re_path(r"^products/(?P<identifier>[-\w]+)/?$", ProductDetailView.as_view(), name="product-detail"),
 
     # Image upload endpoint
     re_path(r"^upload/image/?$", ProductImageUploadView.as_view(), name="product-image-upload"),
@@ -93,6 +98,11 @@ urlpatterns = [
     re_path(r"^currencies/convert/?$", CurrencyConvertView.as_view(), name="currency-convert"),
     re_path(r"^currencies/market/?$", MarketCurrencyView.as_view(), name="market-currency"),
     re_path(r"^currencies/update-rates/?$", CurrencyUpdateRatesView.as_view(), name="currency-update-rates"),
+    re_path(
+        r"^currencies/update-rates/(?P<task_id>[0-9a-f]{32})/?$",
+        CurrencyUpdateRatesStatusView.as_view(),
+        name="currency-update-rates-status",
+    ),
 ]
 
 
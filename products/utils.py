@@ -1,7 +1,35 @@
 """
 Utility functions for market-based filtering
 """
-from django.db.models import Q
+import sys
+
+from .request_cache import request_cached
+
+
+# Interned market/currency codes so equality checks hit the identity fast path
+MARKET_KG = sys.intern('KG')
+MARKET_US = sys.intern('US')
+MARKET_ALL = sys.intern('ALL')
+CURRENCY_KGS = sys.intern('KGS')
+CURRENCY_USD = sys.intern('USD')
+
+# Phone country-code prefix -> market code
+PHONE_PREFIX_MARKETS = (
+    ('+996', MARKET_KG),
+    ('+1', MARKET_US),
+)
+
+# Market code -> currency code
+MARKET_CURRENCY_CODES = {
+    MARKET_KG: CURRENCY_KGS,
+    MARKET_US: CURRENCY_USD,
+}
+
+# Hardcoded exchange rates used when the currencies table is unavailable
+FALLBACK_RATES = {
+    CURRENCY_USD: 1.0,
+    CURRENCY_KGS: 89.5,
+}
 
 
 def filter_by_market(queryset, user_market):
@@ -30,12 +58,19 @@ def filter_by_market(queryset, user_market):
     if not user_market:
         return queryset
     
-    # Normalize market to uppercase
-    user_market = str(user_market).upper()
+    # Normalize market to uppercase (market codes are a small bounded set)
+    user_market = sys.intern(str(user_market).upper())
     
     # Filter: Show products in user's market AND products available in ALL markets
-    # Using OR operator: market = user_market OR market = 'ALL'
-    return queryset.filter(Q(market=user_market) | Q(market='ALL'))
+    # A single IN list (market IN (user_market, 'ALL')) is one index range scan
+    return queryset.filter(market__in=market_codes(user_market))
+
+
+def market_codes(user_market):
+    """Market codes visible to `user_market`: its own and 'ALL'."""
+    if user_market == MARKET_ALL:
+        return (MARKET_ALL,)
+    return (user_market, MARKET_ALL)
 
 
 def get_user_market_from_phone(phone):
@@ -52,14 +87,13 @@ def get_user_market_from_phone(phone):
         market = get_user_market_from_phone('+996505123456')  # Returns 'KG'
         market = get_user_market_from_phone('+15551234567')   # Returns 'US'
     """
-    if phone.startswith('+996'):
-        return 'KG'
-    elif phone.startswith('+1'):
-        return 'US'
-    else:
-        return 'KG'  # Default to KG for unknown country codes
+    for prefix, market in PHONE_PREFIX_MARKETS:
+        if phone.startswith(prefix):
+            return market
+    return MARKET_KG  # Default to KG for unknown country codes
 
 
+@request_cached
 def get_market_currency(market):
     """
     Get currency information for a market.
@@ -78,10 +112,9 @@ def get_market_currency(market):
     
     # Try to get currency from database
     try:
-        if market == 'US':
-            currency = Currency.objects.filter(code='USD', is_active=True).first()
-        elif market == 'KG':
-            currency = Currency.objects.filter(code='KGS', is_active=True).first()
+        currency_code = MARKET_CURRENCY_CODES.get(market)
+        if currency_code:
+            currency = Currency.objects.filter(code=currency_code, is_active=True).first()
         else:
             currency = Currency.objects.filter(is_base=True, is_active=True).first()
         
@@ -98,18 +131,18 @@ def get_market_currency(market):
     
     # Fallback to hardcoded values
     market_currencies = {
-        'KG': {
+        MARKET_KG: {
             'symbol': 'сом',
-            'code': 'KGS',
+            'code': CURRENCY_KGS,
             'name': 'Kyrgyzstani Som',
             'country': 'Kyrgyzstan',
             'language': 'ru',
             'exchange_rate': 89.5,  # Approximate rate to USD
             'is_base': False,
         },
-        'US': {
+        MARKET_US: {
             'symbol': '$',
-            'code': 'USD',
+            'code': CURRENCY_USD,
             'name': 'US Dollar',
             'country': 'United States',
             'language': 'en',
@@ -117,7 +150,24 @@ def get_market_currency(market):
             'is_base': True,
         }
     }
-    return market_currencies.get(market, market_currencies['KG'])
+    return market_currencies.get(market, market_currencies[MARKET_KG])
+
+
+@request_cached
+def _load_rates():
+    """
+    Load exchange rates for all active currencies in a single query.
+
+    Returns:
+        Dictionary mapping currency code to its float exchange rate.
+        The base currency is stored with rate 1.0 (enforced by Currency.clean).
+    """
+    from .models import Currency
+
+    return {
+        code: float(rate)
+        for code, rate in Currency.objects.filter(is_active=True).values_list('code', 'exchange_rate')
+    }
 
 
 def convert_currency(amount: float, from_currency_code: str, to_currency_code: str) -> float:
@@ -136,41 +186,20 @@ def convert_currency(amount: float, from_currency_code: str, to_currency_code: s
         converted = convert_currency(100, 'USD', 'KGS')
         # Returns: 8950.0 (if 1 USD = 89.5 KGS)
     """
-    from .models import Currency
-    
     if from_currency_code == to_currency_code:
         return amount
     
     try:
-        from_currency = Currency.objects.filter(code=from_currency_code, is_active=True).first()
-        to_currency = Currency.objects.filter(code=to_currency_code, is_active=True).first()
-        
-        if not from_currency or not to_currency:
-            return amount  # Return original if currencies not found
-        
-        # Convert to base currency (USD) first, then to target
-        # If from_currency is base, exchange_rate = 1.0
-        # Amount in base = amount / from_currency.exchange_rate
-        # Amount in target = amount_in_base * to_currency.exchange_rate
-        
-        if from_currency.is_base:
-            amount_in_base = amount
-        else:
-            amount_in_base = float(amount) / float(from_currency.exchange_rate)
-        
-        if to_currency.is_base:
-            return amount_in_base
-        else:
-            return amount_in_base * float(to_currency.exchange_rate)
+        rates = _load_rates()
     except Exception:
         # Fallback: use hardcoded rates
-        rates = {
-            'USD': 1.0,
-            'KGS': 89.5,
-        }
-        from_rate = rates.get(from_currency_code, 1.0)
-        to_rate = rates.get(to_currency_code, 1.0)
-        if from_rate == 0:
-            return amount
-        return (amount / from_rate) * to_rate
-
+        rates = FALLBACK_RATES
+    
+    from_rate = rates.get(from_currency_code)
+    to_rate = rates.get(to_currency_code)
+    if not from_rate or to_rate is None:
+        return amount  # Return original if currencies not found
+    
+    # Rates are relative to the base currency (base rate == 1.0), so the
+    # conversion is a single divide + multiply with no is_base branching.
+    return float(amount) / from_rate * to_rate
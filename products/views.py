@@ -4,22 +4,44 @@ Product API views.
 These endpoints power the product catalogue for the Next.js storefront.
 """
 
+import json
 import os
 import unicodedata
-from io import BytesIO
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from decimal import Decimal, InvalidOperation
 from typing import Optional, Tuple
 from uuid import uuid4
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.core.files.base import ContentFile
+from django.core.cache import cache
+from django.core.exceptions import ValidationError as DjangoValidationError
 from django.core.files.storage import default_storage
-from django.db import transaction
-from django.db.models import Case, Count, Max, Min, Prefetch, Q, Sum, Value, When, IntegerField
+from django.db import IntegrityError, transaction
+from django.db.models import (
+    Avg,
+    Case,
+    Count,
+    DecimalField,
+    Exists,
+    F,
+    IntegerField,
+    Max,
+    OuterRef,
+    Prefetch,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+    When,
+    Window,
+)
+from django.utils import timezone
 from django.utils.text import slugify
-from PIL import Image, UnidentifiedImageError
+from PIL import UnidentifiedImageError
 from rest_framework import status
 from rest_framework import serializers
+from rest_framework.exceptions import ParseError
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
@@ -34,7 +56,6 @@ from drf_spectacular.types import OpenApiTypes  # pyright: ignore[reportMissingI
 
 from orders.models import Review, Order, OrderItem  # pyright: ignore[reportMissingImports]
 from .models import (
-    Brand,
     Cart,
     CartItem,
     Category,
@@ -43,6 +64,7 @@ from .models import (
     Subcategory,
     Wishlist,
     WishlistItem,
+    product_count_field,
 )
 from .serializers import (
     CategoryDetailSerializer,
@@ -68,7 +90,17 @@ from .serializers import (
     SubcategoryProductsResponseSerializer,
     ProductSearchResponseSerializer,
 )
-from .utils import filter_by_market, get_market_currency, get_user_market_from_phone
+from .cache import (
+    CATALOG_CACHE_TIMEOUT,
+    FILTERS_CACHE_TIMEOUT,
+    PRODUCTS_PAGE_CACHE_TIMEOUT,
+    catalog_cache_key,
+    conditional_catalog_get,
+    request_cache_digest,
+)
+from .images import encode_upload
+from .search import product_search_filter, search_rank_expression
+from .utils import filter_by_market, get_market_currency, get_user_market_from_phone, market_codes
 
 
 MARKET_QUERY_PARAM = OpenApiParameter(
@@ -162,6 +194,40 @@ PRICE_MAX_PARAM = OpenApiParameter(
     description="Maximum variant price filter.",
 )
 
+AFTER_CURSOR_PARAM = OpenApiParameter(
+    name="after",
+    type=OpenApiTypes.STR,
+    location=OpenApiParameter.QUERY,
+    description=(
+        "Keyset cursor (`next_cursor` of the previous page). Replaces `page` for "
+        "rating, popular, bestsellers and newest sorts."
+    ),
+)
+
+WITH_COUNT_PARAM = OpenApiParameter(
+    name="with_count",
+    type=OpenApiTypes.BOOL,
+    location=OpenApiParameter.QUERY,
+    description=(
+        "Set to 0 to skip counting all matches (total/total_pages become null, "
+        "X-Total-Count is omitted); `has_more` is still returned."
+    ),
+)
+
+MINIMAL_CART_PARAM = OpenApiParameter(
+    name="minimal",
+    type=OpenApiTypes.BOOL,
+    location=OpenApiParameter.QUERY,
+    description="Return cart totals and the affected item only, instead of the full cart.",
+)
+
+MINIMAL_WISHLIST_PARAM = OpenApiParameter(
+    name="minimal",
+    type=OpenApiTypes.BOOL,
+    location=OpenApiParameter.QUERY,
+    description="Return the wishlist size and the affected product only, instead of the full wishlist.",
+)
+
 PRODUCT_SORT_PARAM = OpenApiParameter(
     name="sort_by",
     type=OpenApiTypes.STR,
@@ -178,6 +244,103 @@ SEARCH_SORT_PARAM = OpenApiParameter(
     description="Sort order for search results.",
 )
 
+# Product orderings for the `sort_by` query parameter. Price sorts use the
+# denormalized Product.min_sku_price (kept in sync by products.signals).
+PRODUCT_SORT_ORDERINGS = {
+    "price_asc": ("min_sku_price", "price"),
+    "price_desc": ("-min_sku_price", "-price"),
+    "rating": ("-rating", "-sales_count"),
+    "rating_desc": ("-rating", "-sales_count"),
+    "popular": ("-sales_count", "-rating"),
+    "bestsellers": ("-sales_count", "-rating"),
+    "newest": ("-created_at",),
+}
+
+# Product columns that only the detail serializer reads
+LISTING_DEFERRED_FIELDS = (
+    "ai_description",
+    "style_tags",
+    "occasion_tags",
+    "season_tags",
+    "color_tags",
+    "material_tags",
+    "age_group_tags",
+    "activity_tags",
+    "search_vector",
+)
+
+# Sorts over non-null columns, which can page with a keyset cursor (`after`)
+KEYSET_SORTS = {"rating", "rating_desc", "popular", "bestsellers", "newest"}
+
+
+def product_ordering(sort_by: str) -> Tuple[str, ...]:
+    """Ordering for `sort_by`, with the primary key as tiebreaker so pages are stable."""
+    return (*PRODUCT_SORT_ORDERINGS.get(sort_by, ("-created_at",)), "-id")
+
+
+def encode_cursor(product, ordering) -> str:
+    """Opaque keyset cursor pointing just past `product` in `ordering`."""
+    values = [str(getattr(product, field.lstrip("-"))) for field in ordering]
+    return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def cursor_filter(cursor: str, ordering) -> Q:
+    """Filter selecting the rows after `cursor` in `ordering` (a row-value comparison)."""
+    names = [field.lstrip("-") for field in ordering]
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(names):
+            raise ValueError(cursor)
+        values = [
+            Product._meta.get_field(name).to_python(value) for name, value in zip(names, values)
+        ]
+    except (ValueError, DjangoValidationError):
+        raise ParseError("Invalid cursor.")
+
+    after, equal = Q(), Q()
+    for field, name, value in zip(ordering, names, values):
+        lookup = "lt" if field.startswith("-") else "gt"
+        after |= equal & Q(**{f"{name}__{lookup}": value})
+        equal &= Q(**{name: value})
+    return after
+
+
+def _parse_csv(value: Optional[str]) -> list:
+    """
+    Split a comma-separated query parameter into its unique, non-empty items.
+
+    Duplicates are dropped (keeping first-seen order, so the generated SQL is
+    stable) to keep `IN (...)` lists as short as possible.
+    """
+    if not value:
+        return []
+    return list(dict.fromkeys(item for item in (part.strip() for part in value.split(",")) if item))
+
+
+def _parse_price(value: Optional[str]) -> Optional[Decimal]:
+    """Parse a price query parameter as Decimal (matching the price columns), or None."""
+    if not value:
+        return None
+    try:
+        price = Decimal(value)
+    except InvalidOperation:
+        return None
+    return price if price.is_finite() else None
+
+
+def build_category_queryset(market: Optional[str], *, annotate_counts: bool = False):
+    """
+    Active categories visible in `market`, unordered.
+
+    With `annotate_counts`, `product_count` is exposed from the denormalized
+    per-market column (see Category.refresh_product_counts).
+    """
+    queryset = filter_by_market(Category.objects.filter(is_active=True), market)
+    if annotate_counts:
+        queryset = queryset.annotate(product_count=F(product_count_field(market)))
+    return queryset
+
+
 class MarketAwareAPIView(APIView):
     """
     Common helpers for market-aware API endpoints.
@@ -190,6 +353,18 @@ class MarketAwareAPIView(APIView):
         """
         Resolve the market for the current request.
 
+        The result is memoized on the request, since views resolve it while
+        building the queryset, the payload and the response headers.
+        """
+        market = getattr(request, "_resolved_market", None)
+        if market is None:
+            market = request._resolved_market = self._resolve_market(request)
+        return market
+
+    def _resolve_market(self, request) -> str:
+        """
+        Resolve the market from the request.
+
         Priority:
             1. Authenticated user market
             2. `X-Market` header
@@ -252,11 +427,161 @@ class MarketAwareAPIView(APIView):
             )
         )
 
+    def listing_queryset(self):
+        """
+        Queryset for product cards rendered by ProductListSerializer.
+
+        Skips the image/feature prefetches the card never reads, loads only
+        the SKU columns used for price ranges and size/color lists, and
+        computes review and sales stats as correlated subqueries, instead of
+        three extra queries per product in the serializer. Detail-only
+        columns (AI description, tag lists, search vector) are deferred.
+        """
+        sku_prefetch = Prefetch(
+            "skus",
+            queryset=SKU.objects.select_related("size_option", "color_option").only(
+                "product_id",
+                "price",
+                "original_price",
+                "is_active",
+                "size_option__name",
+                "color_option__name",
+            ),
+        )
+        approved_reviews = (
+            Review.objects.filter(product=OuterRef("pk"), is_approved=True)
+            .order_by()
+            .values("product")
+        )
+        delivered_items = (
+            OrderItem.objects.filter(sku__product=OuterRef("pk"), order__status="delivered")
+            .order_by()
+            .values("sku__product")
+        )
+        return (
+            Product.objects.filter(is_active=True)
+            .select_related("category", "subcategory", "second_subcategory", "store", "brand", "currency")
+            .defer(*LISTING_DEFERRED_FIELDS)
+            .prefetch_related(sku_prefetch)
+            .annotate(
+                approved_rating_avg=Subquery(
+                    approved_reviews.annotate(value=Avg("rating")).values("value")
+                ),
+                approved_rating_count=Subquery(
+                    approved_reviews.annotate(value=Count("pk")).values("value"),
+                    output_field=IntegerField(),
+                ),
+                delivered_sold_count=Subquery(
+                    delivered_items.annotate(value=Sum("quantity")).values("value"),
+                    output_field=IntegerField(),
+                ),
+            )
+        )
+
     def apply_market_filter(self, queryset, market: Optional[str]):
         if not market:
             return queryset
         return filter_by_market(queryset, market)
 
+    @staticmethod
+    def apply_attribute_filters(queryset, request):
+        """
+        Apply the `sizes`/`colors`/`price_min`/`price_max`/`brands` query filters.
+
+        SKU conditions are combined into a single EXISTS subquery (one SKU must
+        match size, color and price together) instead of JOINs, so matching
+        products are never multiplied by their SKUs and need no DISTINCT.
+        """
+        params = request.query_params
+        sku_filters = {}
+        if sizes := _parse_csv(params.get("sizes")):
+            sku_filters["size_option__name__in"] = sizes
+        if colors := _parse_csv(params.get("colors")):
+            sku_filters["color_option__name__in"] = colors
+        if (price_min := _parse_price(params.get("price_min"))) is not None:
+            sku_filters["price__gte"] = price_min
+        if (price_max := _parse_price(params.get("price_max"))) is not None:
+            sku_filters["price__lte"] = price_max
+
+        conditions = []
+        if sku_filters:
+            conditions.append(Exists(SKU.objects.filter(product=OuterRef("pk"), **sku_filters)))
+        if brands := _parse_csv(params.get("brands")):
+            # Filter by brand slug or name
+            conditions.append(Q(brand__slug__in=brands) | Q(brand__name__in=brands))
+        return queryset.filter(*conditions) if conditions else queryset
+
+    @staticmethod
+    def count_products(queryset):
+        """
+        Count products matched by `queryset`'s filters.
+
+        Call before display annotations are added. Multi-valued (SKU) filters
+        are EXISTS subqueries, so rows are never duplicated and this is a plain
+        `SELECT COUNT(*)` without a DISTINCT subquery wrap.
+        """
+        return queryset.order_by().count()
+
+    @staticmethod
+    def wants_total(request) -> bool:
+        """Totals are computed unless the client opts out with `?with_count=0`."""
+        return request.query_params.get("with_count", "").lower() not in ("0", "false")
+
+    def paginate_products(self, queryset, offset: int, limit: int, with_total: bool = True):
+        """
+        Fetch one page of `queryset`; returns `(products, total, has_more)`.
+
+        The total is read from a `COUNT(*) OVER ()` window on the page rows,
+        so only a page past the end needs a separate COUNT query. Without
+        `with_total` the window (which must visit every match) is skipped,
+        one extra row is fetched to tell whether more follow, and total is None.
+        """
+        if not with_total:
+            products = list(queryset[offset : offset + limit + 1])
+            return products[:limit], None, len(products) > limit
+
+        products = list(
+            queryset.annotate(total_count=Window(expression=Count("pk")))[offset : offset + limit]
+        )
+        if products:
+            total = products[0].total_count
+        else:
+            total = self.count_products(queryset) if offset else 0
+        return products, total, offset + limit < total
+
+    def paginate_listing(
+        self,
+        filtered_queryset,
+        sort_by: str,
+        page: int,
+        limit: int,
+        cursor: Optional[str],
+        with_total: bool = True,
+    ):
+        """
+        Sort and page a listing by `page`, or by an `after` keyset cursor.
+
+        Cursor pages seek past the previous page's last row on the sort
+        columns instead of skipping OFFSET rows, so deep pages cost the same
+        as the first. Returns `(products, total, has_more, next_cursor)`.
+        """
+        ordering = product_ordering(sort_by)
+        queryset = filtered_queryset.order_by(*ordering)
+        keyset = sort_by in KEYSET_SORTS
+
+        if cursor and keyset:
+            products = list(queryset.filter(cursor_filter(cursor, ordering))[: limit + 1])
+            total = self.count_products(filtered_queryset) if with_total else None
+            has_more = len(products) > limit
+            products = products[:limit]
+        else:
+            products, total, has_more = self.paginate_products(
+                queryset, (page - 1) * limit, limit, with_total
+            )
+
+        next_cursor = encode_cursor(products[-1], ordering) if keyset and has_more else None
+        return products, total, has_more, next_cursor
+
 
 class CategoryListView(MarketAwareAPIView):
     """
@@ -265,24 +590,7 @@ class CategoryListView(MarketAwareAPIView):
 
     def get_queryset(self, request):
         market = self.resolve_market(request)
-        product_filter = (
-            Q(products__is_active=True, products__in_stock=True)
-            & (Q(products__market=market) | Q(products__market="ALL"))
-        )
-
-        queryset = (
-            Category.objects.filter(is_active=True)
-            .order_by("sort_order", "name")
-            .annotate(
-                # Count products at all levels: direct, via subcategory, and via second_subcategory
-                product_count=Count(
-                    "products",
-                    filter=product_filter,
-                    distinct=True
-                )
-            )
-        )
-        return self.apply_market_filter(queryset, market)
+        return build_category_queryset(market, annotate_counts=True).order_by("sort_order", "name")
 
     @extend_schema(
         summary="Retrieve categories",
@@ -290,20 +598,25 @@ class CategoryListView(MarketAwareAPIView):
         parameters=[MARKET_QUERY_PARAM],
         responses={200: CategoryListResponseSerializer},
     )
+    @conditional_catalog_get
     def get(self, request):
-        queryset = self.get_queryset(request)
-        serializer = CategoryListSerializer(
-            queryset,
-            many=True,
-            context={"request": request},
+        cache_key = catalog_cache_key(
+            "list", self.resolve_market(request), request.build_absolute_uri("/")
         )
-        return Response(
-            {
+        payload = cache.get(cache_key)
+        if payload is None:
+            queryset = self.get_queryset(request)
+            serializer = CategoryListSerializer(
+                queryset,
+                many=True,
+                context={"request": request},
+            )
+            payload = {
                 "categories": serializer.data,
                 "total": queryset.count(),
-            },
-            status=status.HTTP_200_OK,
-        )
+            }
+            cache.set(cache_key, payload, CATALOG_CACHE_TIMEOUT)
+        return Response(payload, status=status.HTTP_200_OK)
 
 
 class PopularCategoriesView(MarketAwareAPIView):
@@ -340,16 +653,9 @@ class PopularCategoriesView(MarketAwareAPIView):
                     distinct=False
                 ),
                 # Product count for market filtering
-                product_count=Count(
-                    "products",
-                    filter=Q(
-                        products__is_active=True,
-                        products__in_stock=True
-                    ) & (Q(products__market=market) | Q(products__market="ALL")),
-                    distinct=True
-                )
+                product_count=F(product_count_field(market)),
             )
-            .distinct()  # Ensure we don't get duplicate categories
+            # The Sum aggregate groups by category, so no DISTINCT is needed
             # Only include categories that have at least one sale
             .filter(total_sales__gt=0)
             # Order by total sales descending, then by name
@@ -373,30 +679,36 @@ class PopularCategoriesView(MarketAwareAPIView):
         ],
         responses={200: CategoryListResponseSerializer},
     )
+    @conditional_catalog_get
     def get(self, request):
-        queryset = self.get_queryset(request)
-        
-        # Apply limit if provided
         limit = request.query_params.get('limit')
-        if limit:
-            try:
-                limit = int(limit)
-                queryset = queryset[:limit]
-            except (ValueError, TypeError):
-                pass
-        
-        serializer = CategoryListSerializer(
-            queryset,
-            many=True,
-            context={"request": request},
+        # The sales ranking joins every order item, so the payload is cached;
+        # orders do not rotate the catalogue version, the TTL bounds staleness.
+        cache_key = catalog_cache_key(
+            "popular", self.resolve_market(request), limit, request.build_absolute_uri("/")
         )
-        return Response(
-            {
+        payload = cache.get(cache_key)
+        if payload is None:
+            queryset = self.get_queryset(request)
+            
+            # Apply limit if provided
+            if limit:
+                try:
+                    queryset = queryset[:int(limit)]
+                except (ValueError, TypeError):
+                    pass
+            
+            serializer = CategoryListSerializer(
+                queryset,
+                many=True,
+                context={"request": request},
+            )
+            payload = {
                 "categories": serializer.data,
                 "total": len(serializer.data),
-            },
-            status=status.HTTP_200_OK,
-        )
+            }
+            cache.set(cache_key, payload, CATALOG_CACHE_TIMEOUT)
+        return Response(payload, status=status.HTTP_200_OK)
 
 
 class CategoryDetailView(MarketAwareAPIView):
@@ -405,16 +717,11 @@ class CategoryDetailView(MarketAwareAPIView):
     """
 
     def get_category(self, request, slug: str) -> Optional[Category]:
-        queryset = CategoryListView().get_queryset(request)
+        queryset = build_category_queryset(self.resolve_market(request), annotate_counts=True)
         return queryset.filter(slug=slug).first()
 
     def get_subcategories(self, category: Category, market: str):
         """Get first-level subcategories (parent_subcategory is None)"""
-        product_filter = (
-            Q(products__is_active=True, products__in_stock=True)
-            & (Q(products__market=market) | Q(products__market="ALL"))
-            & Q(products__second_subcategory__isnull=True)  # Only count level 2 products
-        )
         # Only get first-level subcategories (no parent)
         return (
             Subcategory.objects.filter(
@@ -424,10 +731,39 @@ class CategoryDetailView(MarketAwareAPIView):
             )
             .order_by("sort_order", "name")
             .annotate(
-                product_count=Count("products", filter=product_filter, distinct=True)
+                # Denormalized count of level 2 products (see Subcategory.refresh_product_counts)
+                product_count=F(product_count_field(market))
             )
         )
 
+    def get_payload(self, request, slug: str) -> Optional[dict]:
+        """
+        Build the category + subcategories payload, cached per market and slug.
+
+        Returns None when the category does not exist (misses are not cached).
+        """
+        market = self.resolve_market(request)
+        cache_key = catalog_cache_key("detail", market, slug, request.build_absolute_uri("/"))
+        payload = cache.get(cache_key)
+        if payload is not None:
+            return payload
+
+        category = self.get_category(request, slug)
+        if not category:
+            return None
+
+        subcategories = self.get_subcategories(category, market)
+        payload = {
+            "category": CategoryDetailSerializer(
+                category, context={"request": request}
+            ).data,
+            "subcategories": SubcategoryListSerializer(
+                subcategories, many=True, context={"request": request}
+            ).data,
+        }
+        cache.set(cache_key, payload, CATALOG_CACHE_TIMEOUT)
+        return payload
+
     @extend_schema(
         summary="Retrieve category detail",
         tags=["categories"],
@@ -437,28 +773,15 @@ class CategoryDetailView(MarketAwareAPIView):
             404: OpenApiResponse(description="Category not found."),
         },
     )
+    @conditional_catalog_get
     def get(self, request, slug: str):
-        category = self.get_category(request, slug)
-        if not category:
+        payload = self.get_payload(request, slug)
+        if payload is None:
             return Response(
                 {"detail": "Category not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
-
-        market = self.resolve_market(request)
-        subcategories = self.get_subcategories(category, market)
-
-        return Response(
-            {
-                "category": CategoryDetailSerializer(
-                    category, context={"request": request}
-                ).data,
-                "subcategories": SubcategoryListSerializer(
-                    subcategories, many=True, context={"request": request}
-                ).data,
-            },
-            status=status.HTTP_200_OK,
-        )
+        return Response(payload, status=status.HTTP_200_OK)
 
 
 class CategorySubcategoryListView(CategoryDetailView):
@@ -475,28 +798,15 @@ class CategorySubcategoryListView(CategoryDetailView):
             404: OpenApiResponse(description="Category not found."),
         },
     )
+    @conditional_catalog_get
     def get(self, request, slug: str):
-        category = self.get_category(request, slug)
-        if not category:
+        payload = self.get_payload(request, slug)
+        if payload is None:
             return Response(
                 {"detail": "Category not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
-
-        market = self.resolve_market(request)
-        subcategories = self.get_subcategories(category, market)
-
-        return Response(
-            {
-                "category": CategoryDetailSerializer(
-                    category, context={"request": request}
-                ).data,
-                "subcategories": SubcategoryListSerializer(
-                    subcategories, many=True, context={"request": request}
-                ).data,
-            },
-            status=status.HTTP_200_OK,
-        )
+        return Response(payload, status=status.HTTP_200_OK)
 
 
 class SubcategoryProductsView(MarketAwareAPIView):
@@ -509,37 +819,40 @@ class SubcategoryProductsView(MarketAwareAPIView):
 
     def get_base_queryset(self, request, category_slug: Optional[str], sub_slug: str, second_sub_slug: Optional[str] = None):
         market = self.resolve_market(request)
+        count_field = product_count_field(market)
 
-        category_qs = CategoryListView().get_queryset(request)
-        if category_slug:
-            category = category_qs.filter(slug=category_slug).first()
-        else:
-            category = category_qs.filter(subcategories__slug=sub_slug).first()
-
-        if not category:
-            return None, None, None, None
-
-        product_filter = (
-            Q(products__is_active=True, products__in_stock=True)
-            & (Q(products__market=market) | Q(products__market="ALL"))
-        )
-
-        # Get first-level subcategory
+        # Resolve the first-level subcategory and its category in a single query
         subcategory_qs = (
-            Subcategory.objects.filter(
-                category=category,
+            Subcategory.objects.select_related("category")
+            .filter(
                 slug=sub_slug,
                 parent_subcategory__isnull=True,  # First-level only
-                is_active=True
+                is_active=True,
+                category__is_active=True,
             )
+            .filter(category__market__in=market_codes(market))
             .annotate(
-                product_count=Count("products", filter=product_filter, distinct=True)
+                product_count=F(count_field),
+                category_product_count=F(f"category__{count_field}"),
             )
+            .order_by("category_id")
         )
+        if category_slug:
+            subcategory_qs = subcategory_qs.filter(category__slug=category_slug)
         subcategory = subcategory_qs.first()
+
         if not subcategory:
+            # Only on the miss path: tell "category not found" from "subcategory not found"
+            category_qs = build_category_queryset(market)
+            if category_slug:
+                category = category_qs.filter(slug=category_slug).first()
+            else:
+                category = category_qs.filter(subcategories__slug=sub_slug).first()
             return category, None, None, None
 
+        category = subcategory.category
+        category.product_count = subcategory.category_product_count
+
         # If second_sub_slug is provided, get second-level subcategory
         second_subcategory = None
         if second_sub_slug:
@@ -550,16 +863,14 @@ class SubcategoryProductsView(MarketAwareAPIView):
                     slug=second_sub_slug,
                     is_active=True
                 )
-                .annotate(
-                    product_count=Count("second_level_products", filter=product_filter, distinct=True)
-                )
+                .annotate(product_count=F(count_field))
             )
             second_subcategory = second_subcategory_qs.first()
             if not second_subcategory:
                 return category, subcategory, None, None
 
         # Build product query based on catalog level
-        products_qs = self.base_queryset().filter(category=category, in_stock=True)
+        products_qs = self.listing_queryset().filter(category=category, in_stock=True)
         
         if second_subcategory:
             # Level 3: category -> subcategory -> second_subcategory -> products
@@ -578,101 +889,106 @@ class SubcategoryProductsView(MarketAwareAPIView):
         products_qs = self.apply_market_filter(products_qs, market)
         return category, subcategory, second_subcategory, products_qs
 
-    @staticmethod
-    def _apply_attribute_filters(queryset, request):
-        if sizes := request.query_params.get("sizes"):
-            queryset = queryset.filter(
-                skus__size_option__name__in=[
-                    size.strip() for size in sizes.split(",") if size.strip()
-                ]
-            )
-        if colors := request.query_params.get("colors"):
-            queryset = queryset.filter(
-                skus__color_option__name__in=[
-                    color.strip() for color in colors.split(",") if color.strip()
-                ]
-            )
-        if brands := request.query_params.get("brands"):
-            brand_list = [brand.strip() for brand in brands.split(",") if brand.strip()]
-            # Filter by brand slug or name
-            queryset = queryset.filter(
-                Q(brand__slug__in=brand_list) | Q(brand__name__in=brand_list)
-            )
-        price_min = request.query_params.get("price_min")
-        if price_min:
-            try:
-                queryset = queryset.filter(skus__price__gte=float(price_min))
-            except ValueError:
-                pass
-        price_max = request.query_params.get("price_max")
-        if price_max:
-            try:
-                queryset = queryset.filter(skus__price__lte=float(price_max))
-            except ValueError:
-                pass
-        return queryset
-
     @staticmethod
     def _get_available_filters(base_queryset):
-        sizes = (
-            base_queryset.values_list("skus__size_option__name", flat=True)
-            .distinct()
-            .exclude(skus__size_option__name__isnull=True)
-        )
-        colors = (
-            base_queryset.values_list("skus__color_option__name", flat=True)
-            .distinct()
-            .exclude(skus__color_option__name__isnull=True)
-        )
-        
-        # Get unique brands from products
-        brand_ids = (
-            base_queryset.values_list("brand__id", flat=True)
+        """
+        Collect size/color/brand/price facets for `base_queryset` in one query.
+
+        A single DISTINCT projection over the SKU and brand joins replaces the
+        previous four round trips (three value lists plus a price aggregate).
+        """
+        rows = (
+            base_queryset.order_by()
+            .values_list(
+                "skus__size_option__name",
+                "skus__color_option__name",
+                "skus__price",
+                "brand__name",
+                "brand__slug",
+                "brand__is_active",
+            )
             .distinct()
-            .exclude(brand__isnull=True)
         )
-        
-        # Get Brand objects
-        brands = Brand.objects.filter(id__in=brand_ids, is_active=True).order_by("name")
-        
-        price_agg = base_queryset.aggregate(
-            min_price=Min("skus__price"),
-            max_price=Max("skus__price"),
-        )
-        
+
+        sizes, colors, prices, brands = set(), set(), set(), {}
+        for size, color, price, brand_name, brand_slug, brand_is_active in rows:
+            if size:
+                sizes.add(size)
+            if color:
+                colors.add(color)
+            if price is not None:
+                prices.add(price)
+            if brand_name and brand_is_active:
+                brands[brand_slug] = brand_name
+
         return {
-            "available_sizes": sorted({size for size in sizes if size}),
-            "available_colors": sorted({color for color in colors if color}),
+            "available_sizes": sorted(sizes),
+            "available_colors": sorted(colors),
             "available_brands": [
                 {
-                    "name": brand.name,
-                    "slug": brand.slug,
+                    "name": name,
+                    "slug": slug,
                 }
-                for brand in brands
+                for slug, name in sorted(brands.items(), key=lambda item: item[1])
             ],
             "price_range": {
-                "min": float(price_agg["min_price"]) if price_agg["min_price"] else 0.0,
-                "max": float(price_agg["max_price"]) if price_agg["max_price"] else 0.0,
+                "min": float(min(prices)) if prices else 0.0,
+                "max": float(max(prices)) if prices else 0.0,
             },
         }
 
-    @staticmethod
-    def _apply_sorting(queryset, sort_by: str):
-        if sort_by == "price_asc":
-            return queryset.annotate(min_sku_price=Min("skus__price")).order_by(
-                "min_sku_price", "price"
-            )
-        if sort_by == "price_desc":
-            return queryset.annotate(min_sku_price=Min("skus__price")).order_by(
-                "-min_sku_price", "-price"
-            )
-        if sort_by in {"rating", "rating_desc"}:
-            return queryset.order_by("-rating", "-sales_count")
-        if sort_by == "popular" or sort_by == "bestsellers":
-            return queryset.order_by("-sales_count", "-rating")
-        if sort_by == "newest":
-            return queryset.order_by("-created_at")
-        return queryset.order_by("-created_at")
+    def get_available_filters(self, base_queryset, *cache_parts):
+        """Return `_get_available_filters`, cached per listing (`cache_parts`) and market."""
+        return cache.get_or_set(
+            catalog_cache_key("filters", *cache_parts),
+            lambda: self._get_available_filters(base_queryset),
+            FILTERS_CACHE_TIMEOUT,
+        )
+
+    def get_catalog_sections(self, request, market, category, subcategory=None, second_subcategory=None):
+        """
+        Serialized category/subcategory sections of a listing response.
+
+        They are the same for every page, sort and filter of a listing, so they
+        are cached per listing, market and host under the catalogue version.
+        """
+
+        def serialize():
+            context = {"request": request}
+            sections = {
+                "category": CategoryDetailSerializer(category, context=context).data,
+                "subcategory": (
+                    SubcategoryListSerializer(subcategory, context=context).data if subcategory else None
+                ),
+            }
+            if second_subcategory:
+                sections["second_subcategory"] = SubcategoryListSerializer(
+                    second_subcategory, context=context
+                ).data
+            return sections
+
+        return cache.get_or_set(
+            catalog_cache_key(
+                "sections",
+                market,
+                category.pk,
+                subcategory.pk if subcategory else None,
+                second_subcategory.pk if second_subcategory else None,
+                request.build_absolute_uri("/"),
+            ),
+            serialize,
+            CATALOG_CACHE_TIMEOUT,
+        )
+
+    def page_cache_key(self, request, market):
+        """
+        Cache key for a complete listing response.
+
+        Covers the listing path, host, filters, sort and page; product and SKU
+        changes rotate the catalogue version, so only review and sales counts
+        can lag, by at most PRODUCTS_PAGE_CACHE_TIMEOUT.
+        """
+        return catalog_cache_key("products", market, request_cache_digest(request))
 
     @extend_schema(
         summary="List products within a subcategory",
@@ -680,6 +996,7 @@ class SubcategoryProductsView(MarketAwareAPIView):
         parameters=[
             MARKET_QUERY_PARAM,
             PAGE_QUERY_PARAM,
+            AFTER_CURSOR_PARAM,
             LIMIT_QUERY_PARAM,
             PRODUCT_SORT_PARAM,
             SIZES_PARAM,
@@ -694,6 +1011,7 @@ class SubcategoryProductsView(MarketAwareAPIView):
             404: OpenApiResponse(description="Category or subcategory not found."),
         },
     )
+    @conditional_catalog_get
     def get(
         self,
         request,
@@ -709,6 +1027,12 @@ class SubcategoryProductsView(MarketAwareAPIView):
             )
 
         category_lookup = category_slug if category_slug and category_slug != sub_slug else None
+        market = self.resolve_market(request)
+
+        cache_key = self.page_cache_key(request, market)
+        cached_payload = cache.get(cache_key)
+        if cached_payload is not None:
+            return Response(cached_payload, status=status.HTTP_200_OK)
 
         category, subcategory, second_subcategory, base_queryset = self.get_base_queryset(
             request, category_lookup, sub_slug, second_subcategory_slug
@@ -729,16 +1053,20 @@ class SubcategoryProductsView(MarketAwareAPIView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        filters_payload = self._get_available_filters(base_queryset)
+        filters_payload = self.get_available_filters(
+            base_queryset,
+            market,
+            category.pk,
+            subcategory.pk,
+            second_subcategory.pk if second_subcategory else None,
+        )
 
-        queryset = self._apply_attribute_filters(base_queryset, request).distinct()
+        filtered_queryset = self.apply_attribute_filters(base_queryset, request)
         sort_by = request.query_params.get("sort_by", "popular")
-        queryset = self._apply_sorting(queryset, sort_by)
-
         page, limit = self.resolve_pagination(request, self.default_limit)
-        offset = (page - 1) * limit
-        total = queryset.count()
-        products = queryset[offset : offset + limit]
+        products, total, has_more, next_cursor = self.paginate_listing(
+            filtered_queryset, sort_by, page, limit, request.query_params.get("after")
+        )
 
         serializer = ProductListSerializer(
             products,
@@ -747,31 +1075,30 @@ class SubcategoryProductsView(MarketAwareAPIView):
         )
 
         total_pages = (total + limit - 1) // limit if limit else 1
-        currency = get_market_currency(self.resolve_market(request))
+        currency = get_market_currency(market)
 
+        sections = self.get_catalog_sections(
+            request, market, category, subcategory, second_subcategory
+        )
         response_payload = {
-            "category": CategoryDetailSerializer(
-                category, context={"request": request}
-            ).data,
-            "subcategory": SubcategoryListSerializer(
-                subcategory, context={"request": request}
-            ).data,
+            "category": sections["category"],
+            "subcategory": sections["subcategory"],
             "products": serializer.data,
             "filters": filters_payload,
             "total": total,
             "page": page,
             "limit": limit,
             "total_pages": total_pages,
-            "has_more": page < total_pages,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
             "currency": currency,
         }
         
         # Add second_subcategory to response if it exists (level 3)
         if second_subcategory:
-            response_payload["second_subcategory"] = SubcategoryListSerializer(
-                second_subcategory, context={"request": request}
-            ).data
+            response_payload["second_subcategory"] = sections["second_subcategory"]
 
+        cache.set(cache_key, response_payload, PRODUCTS_PAGE_CACHE_TIMEOUT)
         return Response(response_payload, status=status.HTTP_200_OK)
 
 
@@ -787,6 +1114,7 @@ class CategoryProductsView(SubcategoryProductsView):
         parameters=[
             MARKET_QUERY_PARAM,
             PAGE_QUERY_PARAM,
+            AFTER_CURSOR_PARAM,
             LIMIT_QUERY_PARAM,
             PRODUCT_SORT_PARAM,
             SIZES_PARAM,
@@ -800,33 +1128,38 @@ class CategoryProductsView(SubcategoryProductsView):
             404: OpenApiResponse(description="Category not found."),
         },
     )
+    @conditional_catalog_get
     def get(self, request, slug: str):
-        category = CategoryDetailView().get_category(request, slug)
+        market = self.resolve_market(request)
+        cache_key = self.page_cache_key(request, market)
+        cached_payload = cache.get(cache_key)
+        if cached_payload is not None:
+            return Response(cached_payload, status=status.HTTP_200_OK)
+
+        category = (
+            build_category_queryset(market, annotate_counts=True).filter(slug=slug).first()
+        )
         if not category:
             return Response(
                 {"detail": "Category not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        market = self.resolve_market(request)
-        
         # Get products directly linked to category (no subcategory)
         base_queryset = (
-            self.base_queryset()
+            self.listing_queryset()
             .filter(category=category, subcategory__isnull=True, in_stock=True)
         )
         base_queryset = self.apply_market_filter(base_queryset, market)
 
-        filters_payload = self._get_available_filters(base_queryset)
+        filters_payload = self.get_available_filters(base_queryset, market, category.pk)
 
-        queryset = self._apply_attribute_filters(base_queryset, request).distinct()
+        filtered_queryset = self.apply_attribute_filters(base_queryset, request)
         sort_by = request.query_params.get("sort_by", "popular")
-        queryset = self._apply_sorting(queryset, sort_by)
-
         page, limit = self.resolve_pagination(request, self.default_limit)
-        offset = (page - 1) * limit
-        total = queryset.count()
-        products = queryset[offset : offset + limit]
+        products, total, has_more, next_cursor = self.paginate_listing(
+            filtered_queryset, sort_by, page, limit, request.query_params.get("after")
+        )
 
         serializer = ProductListSerializer(
             products,
@@ -837,10 +1170,9 @@ class CategoryProductsView(SubcategoryProductsView):
         total_pages = (total + limit - 1) // limit if limit else 1
         currency = get_market_currency(market)
 
+        sections = self.get_catalog_sections(request, market, category)
         response_payload = {
-            "category": CategoryDetailSerializer(
-                category, context={"request": request}
-            ).data,
+            "category": sections["category"],
             "subcategory": None,  # Level 1 has no subcategory
             "products": serializer.data,
             "filters": filters_payload,
@@ -848,10 +1180,12 @@ class CategoryProductsView(SubcategoryProductsView):
             "page": page,
             "limit": limit,
             "total_pages": total_pages,
-            "has_more": page < total_pages,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
             "currency": currency,
         }
 
+        cache.set(cache_key, response_payload, PRODUCTS_PAGE_CACHE_TIMEOUT)
         return Response(response_payload, status=status.HTTP_200_OK)
 
 
@@ -892,60 +1226,20 @@ class ProductImageUploadView(APIView):
         upload = serializer.validated_data["image"]  # type: ignore
         folder = serializer.validated_data.get("folder") or "products"  # pyright: ignore[reportGeneralTypeIssues]
 
-        # Validate image using Pillow
         try:
-            upload.seek(0)
-            pil_image = Image.open(upload)
-            pil_image.verify()
-            upload.seek(0)
-            pil_image = Image.open(upload)
+            encoded = encode_upload(upload)
         except (UnidentifiedImageError, OSError):
             return Response(
                 {"detail": "Invalid or unsupported image file."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        original_format = (pil_image.format or "").upper()
-        has_alpha = pil_image.mode in ("RGBA", "LA", "P")
-
-        if has_alpha and pil_image.mode != "RGBA":
-            pil_image = pil_image.convert("RGBA")
-        elif not has_alpha and pil_image.mode not in ("RGB", "L"):
-            pil_image = pil_image.convert("RGB")
-
-        # Resize if image exceeds 2048px on any side
-        max_side = 2048
-        if max(pil_image.size) > max_side:
-            pil_image.thumbnail((max_side, max_side), Image.LANCZOS)
-
-        # Decide output format
-        if has_alpha:
-            target_format = "PNG"
-            extension = ".png"
-            content_type = "image/png"
-        elif original_format in {"JPEG", "JPG"}:
-            target_format = "JPEG"
-            extension = ".jpg"
-            content_type = "image/jpeg"
-        else:
-            target_format = "JPEG"
-            extension = ".jpg"
-            content_type = "image/jpeg"
-
-        buffer = BytesIO()
-        save_kwargs = {
-            "format": target_format,
-        }
-        if target_format == "JPEG":
-            save_kwargs.update({"quality": 85, "optimize": True})
-        pil_image.save(buffer, **save_kwargs)
-        buffer.seek(0)
-
         # Ensure folder path is safe
         safe_folder = slugify(folder) if folder else "products"
-        unique_filename = f"{uuid4().hex}{extension}"
+        unique_filename = f"{uuid4().hex}{encoded.extension}"
         relative_path = os.path.join("uploads", safe_folder, unique_filename)
-        saved_path = default_storage.save(relative_path, ContentFile(buffer.getvalue()))
+        with encoded.file:
+            saved_path = default_storage.save(relative_path, encoded.file)
         file_url = request.build_absolute_uri(default_storage.url(saved_path))
 
         return Response(
@@ -955,10 +1249,10 @@ class ProductImageUploadView(APIView):
                 "path": saved_path.replace("\\", "/"),
                 "filename": os.path.basename(saved_path),
                 "original_filename": upload.name,
-                "content_type": content_type,
-                "size": buffer.getbuffer().nbytes,
-                "width": pil_image.width,
-                "height": pil_image.height,
+                "content_type": encoded.content_type,
+                "size": encoded.size,
+                "width": encoded.width,
+                "height": encoded.height,
             },
             status=status.HTTP_201_CREATED,
         )
@@ -971,12 +1265,7 @@ class BaseUserLookupMixin:
     """Common helpers for stateless cart & wishlist endpoints."""
 
     permission_classes = [AllowAny]
-
-    def get_user(self, user_id):
-        try:
-            return User.objects.get(id=user_id)
-        except (User.DoesNotExist, ValueError, TypeError):
-            return None
+    owner_model = None  # Cart or Wishlist
 
     def parse_user_id(self, request):
         user_id = request.data.get("user_id")
@@ -992,21 +1281,77 @@ class BaseUserLookupMixin:
                 {"detail": "user_id must be an integer."},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        user = self.get_user(user_id)
-        if not user:
-            return None, Response(
-                {"detail": "User not found."},
-                status=status.HTTP_404_NOT_FOUND,
-            )
-        return user, None
+        return user_id, None
+
+    def get_user_object(self, request):
+        """
+        Resolve the payload's `user_id` to that user's cart/wishlist.
+
+        An existing cart/wishlist is fetched by user id in one query; the user
+        row is only checked before creating one.
+        Returns `(object, error_response)`.
+        """
+        user_id, error = self.parse_user_id(request)
+        if error:
+            return None, error
+        instance = self.owner_model.objects.filter(user_id=user_id).first()
+        if instance is None:
+            if not User.objects.filter(id=user_id).exists():
+                return None, Response(
+                    {"detail": "User not found."},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            instance, _created = self.owner_model.objects.get_or_create(user_id=user_id)
+        return instance, None
+
+    @staticmethod
+    def wants_minimal_response(request) -> bool:
+        """Mutation endpoints return a compact summary with `?minimal=1`."""
+        return request.query_params.get("minimal", "").lower() in ("1", "true")
 
 
 class CartBaseView(BaseUserLookupMixin, APIView):
     """Base class for cart operations."""
 
-    def get_cart(self, user):
-        cart, _created = Cart.objects.get_or_create(user=user)
-        return cart
+    owner_model = Cart
+
+    def get_cart(self, request):
+        return self.get_user_object(request)
+
+    @staticmethod
+    def minimal_cart_summary(cart, sku_id: Optional[int] = None):
+        """
+        Cart totals (and the state of the item for `sku_id`) in one aggregate query.
+
+        Lets clients patch their local cart state without the full CartSerializer
+        payload and its item/SKU/product/image queries.
+        """
+        item_filter = Q(sku_id=sku_id)
+        summary = cart.items.aggregate(
+            total_items=Sum("quantity"),
+            total_price=Sum(F("quantity") * F("sku__price"), output_field=DecimalField()),
+            cart_item_id=Max("id", filter=item_filter),
+            quantity=Sum("quantity", filter=item_filter),
+        )
+        return {
+            "success": True,
+            "cart_id": cart.id,
+            "cart_item_id": summary["cart_item_id"],
+            "quantity": summary["quantity"] or 0,
+            "total_items": summary["total_items"] or 0,
+            "total_price": float(summary["total_price"] or 0),
+        }
+
+    @staticmethod
+    def empty_cart_payload(cart):
+        """CartSerializer output for a cart known to be empty, built without queries."""
+        return {
+            "id": cart.id,
+            "user_id": cart.user_id,
+            "items": [],
+            "total_items": 0,
+            "total_price": 0.0,
+        }
 
     def serialize_cart(self, cart, request):
         try:
@@ -1037,24 +1382,43 @@ class CartGetView(CartBaseView):
         responses={200: CartSerializer},
     )
     def post(self, request):
-        user, error = self.parse_user_id(request)
+        cart, error = self.get_cart(request)
         if error:
             return error
-        cart = self.get_cart(user)
         return Response(self.serialize_cart(cart, request), status=status.HTTP_200_OK)
 
 
 class CartAddView(CartBaseView):
     """POST /cart/add"""
 
+    @staticmethod
+    def add_quantity(cart, sku, quantity: int):
+        """
+        Add `quantity` of `sku` to `cart` without holding a row lock.
+
+        The increment is a single atomic `UPDATE ... SET quantity = quantity + n`;
+        the item is only inserted when it is not in the cart yet, and a
+        concurrent insert of the same item falls back to the increment.
+        """
+        items = CartItem.objects.filter(cart=cart, sku=sku)
+        increment = {"quantity": F("quantity") + quantity, "updated_at": timezone.now()}
+        if items.update(**increment):
+            return
+        try:
+            with transaction.atomic():
+                CartItem.objects.create(cart=cart, sku=sku, quantity=quantity)
+        except IntegrityError:
+            items.update(**increment)
+
     @extend_schema(
         summary="Add item to cart",
         tags=["cart"],
         request=CartAddRequestSerializer,
+        parameters=[MINIMAL_CART_PARAM],
         responses={200: CartSerializer},
     )
     def post(self, request):
-        user, error = self.parse_user_id(request)
+        cart, error = self.get_cart(request)
         if error:
             return error
 
@@ -1080,16 +1444,10 @@ class CartAddView(CartBaseView):
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        cart = self.get_cart(user)
-        with transaction.atomic():
-            cart_item, created = CartItem.objects.select_for_update().get_or_create(
-                cart=cart,
-                sku=sku,
-                defaults={"quantity": 0},
-            )
-            cart_item.quantity = cart_item.quantity + quantity
-            cart_item.save()
+        self.add_quantity(cart, sku, quantity)
 
+        if self.wants_minimal_response(request):
+            return Response(self.minimal_cart_summary(cart, sku.id), status=status.HTTP_200_OK)
         return Response(self.serialize_cart(cart, request), status=status.HTTP_200_OK)
 
 
@@ -1100,10 +1458,11 @@ class CartUpdateView(CartBaseView):
         summary="Update cart item quantity",
         tags=["cart"],
         request=CartUpdateRequestSerializer,
+        parameters=[MINIMAL_CART_PARAM],
         responses={200: CartSerializer},
     )
     def post(self, request):
-        user, error = self.parse_user_id(request)
+        cart, error = self.get_cart(request)
         if error:
             return error
 
@@ -1125,8 +1484,6 @@ class CartUpdateView(CartBaseView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        cart = self.get_cart(user)
-        
         # First check if cart item exists (without select_for_update, outside transaction)
         try:
             cart_item = cart.items.select_related('sku', 'sku__product').get(id=cart_item_id)
@@ -1160,6 +1517,11 @@ class CartUpdateView(CartBaseView):
                 cart_item.quantity = quantity
                 cart_item.save()
 
+        if self.wants_minimal_response(request):
+            return Response(
+                self.minimal_cart_summary(cart, cart_item.sku_id), status=status.HTTP_200_OK
+            )
+
         # Refresh cart from database to ensure we have latest data
         try:
             cart.refresh_from_db()
@@ -1198,10 +1560,11 @@ class CartRemoveView(CartBaseView):
         summary="Remove item from cart",
         tags=["cart"],
         request=CartRemoveRequestSerializer,
+        parameters=[MINIMAL_CART_PARAM],
         responses={200: CartSerializer},
     )
     def post(self, request):
-        user, error = self.parse_user_id(request)
+        cart, error = self.get_cart(request)
         if error:
             return error
 
@@ -1220,8 +1583,12 @@ class CartRemoveView(CartBaseView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        cart = self.get_cart(user)
         cart.items.filter(id=cart_item_id).delete()
+        if self.wants_minimal_response(request):
+            return Response(self.minimal_cart_summary(cart), status=status.HTTP_200_OK)
+        if not cart.items.exists():
+            # Removing the last item: skip the serializer's reload and prefetches
+            return Response(self.empty_cart_payload(cart), status=status.HTTP_200_OK)
         return Response(self.serialize_cart(cart, request), status=status.HTTP_200_OK)
 
 
@@ -1232,23 +1599,46 @@ class CartClearView(CartBaseView):
         summary="Clear cart",
         tags=["cart"],
         request=CartClearRequestSerializer,
+        parameters=[MINIMAL_CART_PARAM],
         responses={200: CartSerializer},
     )
     def post(self, request):
-        user, error = self.parse_user_id(request)
+        cart, error = self.get_cart(request)
         if error:
             return error
-        cart = self.get_cart(user)
         cart.items.all().delete()
-        return Response(self.serialize_cart(cart, request), status=status.HTTP_200_OK)
+        if self.wants_minimal_response(request):
+            return Response(self.minimal_cart_summary(cart), status=status.HTTP_200_OK)
+        return Response(self.empty_cart_payload(cart), status=status.HTTP_200_OK)
 
 
 class WishlistBaseView(BaseUserLookupMixin, APIView):
     """Base functionality for wishlist operations."""
 
-    def get_wishlist(self, user):
-        wishlist, _created = Wishlist.objects.get_or_create(user=user)
-        return wishlist
+    owner_model = Wishlist
+
+    def get_wishlist(self, request):
+        return self.get_user_object(request)
+
+    @staticmethod
+    def minimal_wishlist_summary(wishlist, product_id=None):
+        """
+        Wishlist size (and whether `product_id` is in it) in one aggregate query.
+
+        Lets clients patch their local wishlist state without serializing every
+        wishlisted product.
+        """
+        summary = wishlist.items.aggregate(
+            total_items=Count("id"),
+            matching=Count("id", filter=Q(product_id=product_id)),
+        )
+        return {
+            "success": True,
+            "wishlist_id": wishlist.id,
+            "product_id": product_id,
+            "in_wishlist": bool(summary["matching"]),
+            "total_items": summary["total_items"],
+        }
 
     def serialize_wishlist(self, wishlist, request):
         serializer = WishlistSerializer(wishlist, context={"request": request})
@@ -1265,10 +1655,9 @@ class WishlistGetView(WishlistBaseView):
         responses={200: WishlistSerializer},
     )
     def post(self, request):
-        user, error = self.parse_user_id(request)
+        wishlist, error = self.get_wishlist(request)
         if error:
             return error
-        wishlist = self.get_wishlist(user)
         return Response(self.serialize_wishlist(wishlist, request), status=status.HTTP_200_OK)
 
 
@@ -1279,10 +1668,11 @@ class WishlistAddView(WishlistBaseView):
         summary="Add product to wishlist",
         tags=["wishlist"],
         request=WishlistAddRequestSerializer,
+        parameters=[MINIMAL_WISHLIST_PARAM],
         responses={200: WishlistSerializer},
     )
     def post(self, request):
-        user, error = self.parse_user_id(request)
+        wishlist, error = self.get_wishlist(request)
         if error:
             return error
 
@@ -1293,17 +1683,23 @@ class WishlistAddView(WishlistBaseView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        try:
-            product = Product.objects.get(id=product_id, is_active=True)
-        except Product.DoesNotExist:
+        if not Product.objects.filter(id=product_id, is_active=True).exists():
             return Response(
                 {"detail": "Product not found."},
                 status=status.HTTP_404_NOT_FOUND,
             )
 
-        wishlist = self.get_wishlist(user)
-        WishlistItem.objects.get_or_create(wishlist=wishlist, product=product)
+        # One INSERT ... ON CONFLICT DO NOTHING against the (wishlist, product)
+        # unique constraint, instead of get_or_create's SELECT + INSERT race
+        WishlistItem.objects.bulk_create(
+            [WishlistItem(wishlist=wishlist, product_id=product_id)],
+            ignore_conflicts=True,
+        )
 
+        if self.wants_minimal_response(request):
+            return Response(
+                self.minimal_wishlist_summary(wishlist, product_id), status=status.HTTP_200_OK
+            )
         return Response(self.serialize_wishlist(wishlist, request), status=status.HTTP_200_OK)
 
 
@@ -1314,10 +1710,11 @@ class WishlistRemoveView(WishlistBaseView):
         summary="Remove product from wishlist",
         tags=["wishlist"],
         request=WishlistRemoveRequestSerializer,
+        parameters=[MINIMAL_WISHLIST_PARAM],
         responses={200: WishlistSerializer},
     )
     def post(self, request):
-        user, error = self.parse_user_id(request)
+        wishlist, error = self.get_wishlist(request)
         if error:
             return error
 
@@ -1328,9 +1725,12 @@ class WishlistRemoveView(WishlistBaseView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        wishlist = self.get_wishlist(user)
         wishlist.items.filter(product_id=product_id).delete()
 
+        if self.wants_minimal_response(request):
+            return Response(
+                self.minimal_wishlist_summary(wishlist, product_id), status=status.HTTP_200_OK
+            )
         return Response(self.serialize_wishlist(wishlist, request), status=status.HTTP_200_OK)
 
 
@@ -1341,16 +1741,24 @@ class WishlistClearView(WishlistBaseView):
         summary="Clear wishlist",
         tags=["wishlist"],
         request=WishlistClearRequestSerializer,
+        parameters=[MINIMAL_WISHLIST_PARAM],
         responses={200: WishlistClearResponseSerializer},
     )
     def post(self, request):
-        user, error = self.parse_user_id(request)
+        wishlist, error = self.get_wishlist(request)
         if error:
             return error
 
-        wishlist = self.get_wishlist(user)
         wishlist.items.all().delete()
 
+        if self.wants_minimal_response(request):
+            return Response(
+                {
+                    "message": "Wishlist cleared.",
+                    **self.minimal_wishlist_summary(wishlist),
+                },
+                status=status.HTTP_200_OK,
+            )
         return Response(
             {
                 "success": True,
@@ -1367,7 +1775,7 @@ class ProductListView(MarketAwareAPIView):
     """
 
     def get_queryset(self, request):
-        queryset = self.base_queryset().filter(in_stock=True)
+        queryset = self.listing_queryset().filter(in_stock=True)
         market = self.resolve_market(request)
         queryset = self.apply_market_filter(queryset, market)
 
@@ -1389,8 +1797,7 @@ class ProductListView(MarketAwareAPIView):
         if gender:
             queryset = queryset.filter(gender=gender.upper())
 
-        queryset = queryset.order_by("-is_featured", "-sales_count", "-rating", "-created_at")
-        return queryset.distinct()
+        return queryset.order_by("-is_featured", "-sales_count", "-rating", "-created_at")
 
     @extend_schema(
         summary="List products",
@@ -1402,20 +1809,27 @@ class ProductListView(MarketAwareAPIView):
             BRAND_FILTER_PARAM,
             GENDER_FILTER_PARAM,
             LIMIT_QUERY_PARAM,
+            WITH_COUNT_PARAM,
         ],
         responses={200: ProductListSerializer(many=True)},
     )
+    @conditional_catalog_get
     def get(self, request):
         queryset = self.get_queryset(request)
         limit = self.resolve_limit(request, default=25)
+        # The total rides on the page rows (COUNT(*) OVER ()), not a second query
+        products, total, _has_more = self.paginate_products(
+            queryset, 0, limit, self.wants_total(request)
+        )
         serializer = ProductListSerializer(
-            queryset[:limit],
+            products,
             many=True,
             context={"request": request},
         )
 
         response = Response(serializer.data, status=status.HTTP_200_OK)
-        response["X-Total-Count"] = queryset.count()
+        if total is not None:
+            response["X-Total-Count"] = total
         response["X-Currency-Code"] = get_market_currency(self.resolve_market(request)).get("code")
         return response
 
@@ -1448,19 +1862,24 @@ class ProductBestSellerView(ProductListView):
     @extend_schema(
         summary="List best-seller products",
         tags=["products"],
-        parameters=[MARKET_QUERY_PARAM, LIMIT_QUERY_PARAM],
+        parameters=[MARKET_QUERY_PARAM, LIMIT_QUERY_PARAM, WITH_COUNT_PARAM],
         responses={200: ProductListSerializer(many=True)},
     )
+    @conditional_catalog_get
     def get(self, request):
         queryset = self.get_queryset(request)
         limit = self.resolve_limit(request, default=12)
+        products, total, _has_more = self.paginate_products(
+            queryset, 0, limit, self.wants_total(request)
+        )
         serializer = ProductListSerializer(
-            queryset[:limit],
+            products,
             many=True,
             context={"request": request},
         )
         response = Response(serializer.data, status=status.HTTP_200_OK)
-        response["X-Total-Count"] = queryset.count()
+        if total is not None:
+            response["X-Total-Count"] = total
         response["X-Currency-Code"] = get_market_currency(self.resolve_market(request)).get("code")
         return response
 
@@ -1484,18 +1903,20 @@ class ProductSearchView(MarketAwareAPIView):
             PRICE_MIN_PARAM,
             PRICE_MAX_PARAM,
             PAGE_QUERY_PARAM,
+            AFTER_CURSOR_PARAM,
             LIMIT_QUERY_PARAM,
+            WITH_COUNT_PARAM,
             SEARCH_SORT_PARAM,
         ],
         responses={200: ProductSearchResponseSerializer},
     )
+    @conditional_catalog_get
     def get(self, request):
         query = request.query_params.get("query", "").strip()
         market = self.resolve_market(request)
         page, limit = self.resolve_pagination(request, default_limit=20)
-        offset = (page - 1) * limit
 
-        queryset = self.base_queryset().filter(in_stock=True)
+        queryset = self.listing_queryset().filter(in_stock=True)
         queryset = self.apply_market_filter(queryset, market)
 
         if query:
@@ -1511,18 +1932,9 @@ class ProductSearchView(MarketAwareAPIView):
             # 4. SKU code contains (partial match)
             # 5. Description contains
             # 6. Category/subcategory name contains
-            # Django's icontains is Unicode-aware and handles multi-language searches automatically
-            # It works with Cyrillic (Russian, Kyrgyz), Latin (English), and other Unicode scripts
-            search_q = (
-                Q(name__icontains=normalized_query)
-                | Q(brand__name__icontains=normalized_query)
-                | Q(description__icontains=normalized_query)
-                | Q(category__name__icontains=normalized_query)
-                | Q(subcategory__name__icontains=normalized_query)
-                | Q(skus__sku_code__iexact=normalized_query)  # Exact SKU match
-                | Q(skus__sku_code__icontains=normalized_query)  # Partial SKU match
-            )
-            queryset = queryset.filter(search_q)
+            # Matching is Unicode-aware (Cyrillic, Latin, ...); see products.search for
+            # the stored search vector used on PostgreSQL and the icontains fallback.
+            queryset = queryset.filter(product_search_filter(normalized_query))
 
         # Additional filters
         if category_slug := request.query_params.get("category"):
@@ -1530,105 +1942,23 @@ class ProductSearchView(MarketAwareAPIView):
         if subcategory_slug := request.query_params.get("subcategory"):
             queryset = queryset.filter(subcategory__slug=subcategory_slug)
 
-        if sizes := request.query_params.get("sizes"):
-            queryset = queryset.filter(skus__size_option__name__in=[size.strip() for size in sizes.split(",") if size.strip()])
-
-        if colors := request.query_params.get("colors"):
-            queryset = queryset.filter(skus__color_option__name__in=[color.strip() for color in colors.split(",") if color.strip()])
-
-        if brands := request.query_params.get("brands"):
-            brand_list = [brand.strip() for brand in brands.split(",") if brand.strip()]
-            queryset = queryset.filter(
-                Q(brand__slug__in=brand_list) | Q(brand__name__in=brand_list)
-            )
-
-        price_min = request.query_params.get("price_min")
-        price_max = request.query_params.get("price_max")
-        if price_min:
-            try:
-                queryset = queryset.filter(skus__price__gte=float(price_min))
-            except ValueError:
-                pass
-        if price_max:
-            try:
-                queryset = queryset.filter(skus__price__lte=float(price_max))
-            except ValueError:
-                pass
-
-        queryset = queryset.annotate(
-            min_sku_price=Min("skus__price"),
-        ).distinct()
+        queryset = self.apply_attribute_filters(queryset, request)
 
         sort_by = request.query_params.get("sort_by", "relevance" if query else "popular")
-        
-        # Apply relevance-based sorting by default when query exists
-        if sort_by == "relevance" and query:
-            # Check if query looks like a SKU (numeric or alphanumeric code)
-            is_sku_like = query.replace("-", "").replace("_", "").isalnum() and len(query) >= 3
-            
-            if is_sku_like:
-                # For SKU-like queries, prioritize exact SKU matches first
-                # Then by name matches, then by sales/rating
-                queryset = queryset.annotate(
-                    has_exact_sku=Case(
-                        When(skus__sku_code__iexact=query, then=Value(1)),
-                        default=Value(0),
-                        output_field=IntegerField(),
-                    ),
-                    has_partial_sku=Case(
-                        When(skus__sku_code__icontains=query, then=Value(1)),
-                        default=Value(0),
-                        output_field=IntegerField(),
-                    ),
-                ).order_by(
-                    "-has_exact_sku",  # Exact SKU matches first
-                    "-has_partial_sku",  # Partial SKU matches second
-                    "-sales_count",  # Then by popularity
-                    "-rating",  # Then by rating
-                    "-created_at"  # Finally by newest
-                )
-            else:
-                # For text queries, prioritize name matches, then brand, then other
-                queryset = queryset.annotate(
-                    name_exact=Case(
-                        When(name__iexact=query, then=Value(1)),
-                        default=Value(0),
-                        output_field=IntegerField(),
-                    ),
-                    name_starts=Case(
-                        When(name__istartswith=query, then=Value(1)),
-                        default=Value(0),
-                        output_field=IntegerField(),
-                    ),
-                    brand_exact=Case(
-                        When(brand__name__iexact=query, then=Value(1)),
-                        default=Value(0),
-                        output_field=IntegerField(),
-                    ),
-                ).order_by(
-                    "-name_exact",  # Exact name matches first
-                    "-name_starts",  # Name starts with query second
-                    "-brand_exact",  # Brand matches third
-                    "-sales_count",  # Then by popularity
-                    "-rating",  # Then by rating
-                    "-created_at"  # Finally by newest
-                )
-        elif sort_by == "price_asc":
-            queryset = queryset.order_by("min_sku_price", "price")
-        elif sort_by == "price_desc":
-            queryset = queryset.order_by("-min_sku_price", "-price")
-        elif sort_by == "rating" or sort_by == "rating_desc":
-            queryset = queryset.order_by("-rating", "-sales_count")
-        elif sort_by == "popular" or sort_by == "bestsellers":
-            queryset = queryset.order_by("-sales_count", "-rating")
-        elif sort_by == "newest":
-            queryset = queryset.order_by("-created_at")
+        if sort_by not in PRODUCT_SORT_ORDERINGS and not (sort_by == "relevance" and query):
+            sort_by = "popular"  # Default fallback
+
+        with_total = self.wants_total(request)
+        if sort_by in PRODUCT_SORT_ORDERINGS:
+            # Column sorts page by keyset cursor (`after`) as well as by page
+            products, total, has_more, next_cursor = self.paginate_listing(
+                queryset, sort_by, page, limit, request.query_params.get("after"), with_total
+            )
         else:
-            # Default fallback
-            queryset = queryset.order_by("-sales_count", "-rating", "-created_at")
-
-        total = queryset.count()
-        products = queryset[offset : offset + limit]
+            products, total, has_more = self.paginate_by_relevance(
+                queryset, query, page, limit, with_total
+            )
+            next_cursor = None
 
         serializer = ProductListSerializer(
             products,
@@ -1636,7 +1966,7 @@ class ProductSearchView(MarketAwareAPIView):
             context={"request": request},
         )
 
-        total_pages = (total + limit - 1) // limit if limit else 1
+        total_pages = (total + limit - 1) // limit if total is not None else None
         currency = get_market_currency(market)
 
         return Response(
@@ -1646,12 +1976,72 @@ class ProductSearchView(MarketAwareAPIView):
                 "page": page,
                 "limit": limit,
                 "total_pages": total_pages,
-                "has_more": page < total_pages,
+                "has_more": has_more,
+                "next_cursor": next_cursor,
                 "currency": currency,
             },
             status=status.HTTP_200_OK,
         )
 
+    def paginate_by_relevance(self, queryset, query: str, page: int, limit: int, with_total: bool = True):
+        """Order matches for `query` by relevance and return `(products, total, has_more)` for `page`."""
+        normalized_query = unicodedata.normalize('NFKC', query)
+
+        # Check if query looks like a SKU (numeric or alphanumeric code)
+        is_sku_like = query.replace("-", "").replace("_", "").isalnum() and len(query) >= 3
+
+        if is_sku_like:
+            # For SKU-like queries, prioritize exact SKU matches first
+            # Then by name matches, then by sales/rating
+            # EXISTS rather than a join on skus, so products are not repeated per SKU
+            queryset = queryset.annotate(
+                has_exact_sku=Exists(
+                    SKU.objects.filter(product=OuterRef("pk"), sku_code__iexact=query)
+                ),
+                has_partial_sku=Exists(
+                    SKU.objects.filter(product=OuterRef("pk"), sku_code__icontains=query)
+                ),
+            ).order_by(
+                "-has_exact_sku",  # Exact SKU matches first
+                "-has_partial_sku",  # Partial SKU matches second
+                "-sales_count",  # Then by popularity
+                "-rating",  # Then by rating
+                "-created_at"  # Finally by newest
+            )
+        else:
+            # For text queries, prioritize name matches, then brand, then other
+            queryset = queryset.annotate(
+                name_exact=Case(
+                    When(name__iexact=query, then=Value(1)),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                ),
+                name_starts=Case(
+                    When(name__istartswith=query, then=Value(1)),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                ),
+                brand_exact=Case(
+                    When(brand__name__iexact=query, then=Value(1)),
+                    default=Value(0),
+                    output_field=IntegerField(),
+                ),
+            )
+            ordering = ["-name_exact", "-name_starts", "-brand_exact"]
+            # On PostgreSQL, rank the remaining matches by weighted full-text relevance
+            rank = search_rank_expression(normalized_query)
+            if rank is not None:
+                queryset = queryset.annotate(search_rank=rank)
+                ordering.append("-search_rank")
+            queryset = queryset.order_by(
+                *ordering,  # Exact name, name prefix, brand matches, then relevance
+                "-sales_count",  # Then by popularity
+                "-rating",  # Then by rating
+                "-created_at"  # Finally by newest
+            )
+
+        return self.paginate_products(queryset, (page - 1) * limit, limit, with_total)
+
 
 class ProductDetailView(MarketAwareAPIView):
     """
@@ -1663,19 +2053,29 @@ class ProductDetailView(MarketAwareAPIView):
             "reviews",
             queryset=Review.objects.select_related("user").filter(is_approved=True),
         )
-        queryset = self.base_queryset().prefetch_related(reviews_prefetch)
+        # The stored search vector is only used for matching, never rendered
+        queryset = self.base_queryset().defer("search_vector").prefetch_related(reviews_prefetch)
         market = self.resolve_market(request)
         return self.apply_market_filter(queryset, market)
 
     def get_object(self, request, identifier: str) -> Optional[Product]:
         queryset = self.get_queryset(request)
-        product = queryset.filter(slug=identifier).first()
-        if product:
-            return product
+        if not identifier.isdigit():
+            return queryset.filter(slug=identifier).first()
 
-        if identifier.isdigit():
-            return queryset.filter(id=int(identifier)).first()
-        return None
+        # Numeric identifiers may be a slug or an id: resolve both in one query,
+        # preferring a slug match, so the prefetches run only once.
+        return (
+            queryset.filter(Q(slug=identifier) | Q(id=int(identifier)))
+            .order_by(
+                Case(
+                    When(slug=identifier, then=Value(0)),
+                    default=Value(1),
+                    output_field=IntegerField(),
+                )
+            )
+            .first()
+        )
 
     @extend_schema(
         summary="Retrieve product detail",
@@ -1686,23 +2086,30 @@ class ProductDetailView(MarketAwareAPIView):
             404: OpenApiResponse(description="Product not found."),
         },
     )
+    @conditional_catalog_get
     def get(self, request, identifier: str):
-        product = self.get_object(request, identifier)
-        if not product:
-            return Response(
-                {
-                    "detail": "Product not found.",
-                    "slug": identifier,
-                },
-                status=status.HTTP_404_NOT_FOUND,
-            )
+        market = self.resolve_market(request)
+        cache_key = catalog_cache_key("product", market, identifier, request.build_absolute_uri("/"))
+        payload = cache.get(cache_key)
+        if payload is None:
+            product = self.get_object(request, identifier)
+            if not product:
+                return Response(
+                    {
+                        "detail": "Product not found.",
+                        "slug": identifier,
+                    },
+                    status=status.HTTP_404_NOT_FOUND,
+                )
 
-        serializer = ProductDetailSerializer(
-            product,
-            context={"request": request},
-        )
-        response = Response(serializer.data, status=status.HTTP_200_OK)
-        currency = get_market_currency(self.resolve_market(request))
+            payload = ProductDetailSerializer(
+                product,
+                context={"request": request},
+            ).data
+            cache.set(cache_key, payload, CATALOG_CACHE_TIMEOUT)
+
+        response = Response(payload, status=status.HTTP_200_OK)
+        currency = get_market_currency(market)
         response["X-Currency-Code"] = currency.get("code")
         response["X-Currency-Symbol"] = currency.get("symbol")
         return response
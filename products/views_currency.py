@@ -2,6 +2,10 @@
 Currency conversion API views.
 """
 
+import re
+import threading
+from uuid import uuid4
+
 from rest_framework import status, serializers
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
@@ -14,13 +18,22 @@ from drf_spectacular.utils import (
     inline_serializer,
 )
 
+from django.core.cache import cache
+from django.db import connections
+
+from .cache import CURRENCY_CACHE_TIMEOUT, cache_is_shared, catalog_cache_key
 from .models import Currency
 from .serializers import CurrencySerializer
-from .utils import convert_currency, get_market_currency
+from .utils import MARKET_CURRENCY_CODES, get_market_currency
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from django.core.management import call_command
 from io import StringIO
-from io import StringIO
+
+
+RATE_UPDATE_STATUS_TIMEOUT = 3600  # seconds a background update's status stays readable
+
+# Summary line printed by the update_exchange_rates command
+UPDATED_COUNT_RE = re.compile(r'Successfully updated (\d+)')
 
 
 class CurrencyListView(APIView):
@@ -36,9 +49,18 @@ class CurrencyListView(APIView):
         },
     )
     def get(self, request):
-        currencies = Currency.objects.filter(is_active=True).order_by('code')
-        serializer = CurrencySerializer(currencies, many=True)
-        return Response(serializer.data)
+        # Cached under the catalogue version, which currency saves rotate
+        payload = cache.get_or_set(
+            catalog_cache_key("currencies"),
+            lambda: CurrencySerializer(
+                Currency.objects.filter(is_active=True)
+                .only(*CurrencySerializer.Meta.fields)
+                .order_by('code'),
+                many=True,
+            ).data,
+            CURRENCY_CACHE_TIMEOUT,
+        )
+        return Response(payload)
 
 
 class CurrencyConvertView(APIView):
@@ -108,31 +130,28 @@ class CurrencyConvertView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Get currency info
-        try:
-            from_curr = Currency.objects.get(code=from_currency.upper(), is_active=True)
-            to_curr = Currency.objects.get(code=to_currency.upper(), is_active=True)
-        except Currency.DoesNotExist:
+        from_code, to_code = from_currency.upper(), to_currency.upper()
+
+        # Load both currencies in one query
+        rates = dict(
+            Currency.objects.filter(code__in=(from_code, to_code), is_active=True)
+            .values_list('code', 'exchange_rate')
+        )
+        if from_code not in rates or to_code not in rates:
             return Response(
                 {"error": "Currency not found. Please check currency codes."},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Calculate exchange rate
-        if from_curr.is_base:
-            exchange_rate = float(to_curr.exchange_rate)
-        elif to_curr.is_base:
-            exchange_rate = 1.0 / float(from_curr.exchange_rate)
-        else:
-            # Both are not base, convert through base
-            exchange_rate = float(to_curr.exchange_rate) / float(from_curr.exchange_rate)
-        
-        converted_amount = convert_currency(amount_float, from_currency.upper(), to_currency.upper())
+        # Rates are relative to the base currency (base rate == 1.0), so one
+        # ratio covers base -> other, other -> base and other -> other.
+        exchange_rate = float(rates[to_code]) / float(rates[from_code])
+        converted_amount = amount_float * exchange_rate
         
         return Response({
             "amount": amount_float,
-            "from_currency": from_currency.upper(),
-            "to_currency": to_currency.upper(),
+            "from_currency": from_code,
+            "to_currency": to_code,
             "converted_amount": round(converted_amount, 2),
             "exchange_rate": round(exchange_rate, 6),
         })
@@ -166,35 +185,109 @@ class MarketCurrencyView(APIView):
     def get(self, request):
         market = request.query_params.get('market', '').upper()
         
-        if market not in ['KG', 'US']:
+        if market not in MARKET_CURRENCY_CODES:
             return Response(
                 {"error": "Invalid market. Must be 'KG' or 'US'"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        currency_info = get_market_currency(market)
-        
+        cache_key = catalog_cache_key("market-currency", market)
+        payload = cache.get(cache_key)
+        if payload is None:
+            payload = self.get_payload(market)
+            cache.set(cache_key, payload, CURRENCY_CACHE_TIMEOUT)
+        return Response(payload)
+
+    @staticmethod
+    def get_payload(market):
         # Try to get full currency object
         try:
-            if market == 'US':
-                currency = Currency.objects.filter(code='USD', is_active=True).first()
-            elif market == 'KG':
-                currency = Currency.objects.filter(code='KGS', is_active=True).first()
+            currency_code = MARKET_CURRENCY_CODES.get(market)
+            if currency_code:
+                currency = Currency.objects.filter(code=currency_code, is_active=True).first()
             else:
                 currency = Currency.objects.filter(is_base=True, is_active=True).first()
             
             if currency:
                 serializer = CurrencySerializer(currency)
-                return Response(serializer.data)
+                return serializer.data
         except Exception:
             pass
         
         # Fallback to dictionary
-        return Response(currency_info)
+        return get_market_currency(market)
+
+
+def run_rate_update(api_provider, force):
+    """
+    Run the update_exchange_rates command and summarise its outcome.
+
+    Returns a dict with `success`, `message`, `updated_count` and the command
+    output; failures are reported in the dict rather than raised.
+    """
+    # Capture command output
+    out = StringIO()
+    err = StringIO()
+    
+    try:
+        call_command(
+            'update_exchange_rates',
+            api=api_provider,
+            force=force,
+            stdout=out,
+            stderr=err,
+        )
+    except Exception as e:
+        return {
+            'success': False,
+            'message': f'Failed to update exchange rates: {str(e)}',
+            'error': str(e),
+            'output': out.getvalue(),
+            'error_output': err.getvalue(),
+        }
+
+    output = out.getvalue()
+    # Extract number from "Successfully updated X currency exchange rate(s)"
+    match = UPDATED_COUNT_RE.search(output)
+    return {
+        'success': True,
+        'message': 'Exchange rates updated successfully',
+        'updated_count': int(match.group(1)) if match else 0,
+        'output': output,
+    }
+
+
+def rate_update_cache_key(task_id):
+    return f"currency:rate-update:{task_id}"
+
+
+def _run_rate_update_in_background(task_id, api_provider, force):
+    cache_key = rate_update_cache_key(task_id)
+    cache.set(cache_key, {'task_id': task_id, 'status': 'running'}, RATE_UPDATE_STATUS_TIMEOUT)
+    try:
+        result = run_rate_update(api_provider, force)
+    finally:
+        # The thread opened its own database connection
+        connections.close_all()
+    cache.set(
+        cache_key,
+        {'task_id': task_id, 'status': 'finished' if result['success'] else 'failed', **result},
+        RATE_UPDATE_STATUS_TIMEOUT,
+    )
 
 
 class CurrencyUpdateRatesView(APIView):
-    """Update exchange rates from external API."""
+    """
+    Update exchange rates from external API.
+
+    The update runs within the request and returns its result. The provider
+    calls can take seconds, so `?async=1` runs it in a background thread
+    instead and answers 202 with a task id to poll at
+    /currencies/update-rates/<task_id>. Async mode needs a cache shared by
+    all workers (REDIS_URL) to hold the task status, and is refused
+    otherwise. The thread does not survive a worker restart; a task
+    interrupted that way stays "running" until its status expires.
+    """
     
     permission_classes = [IsAuthenticated, IsAdminUser]  # Only admins can update rates
     
@@ -216,6 +309,13 @@ class CurrencyUpdateRatesView(APIView):
                 required=False,
                 description="Force update even if rates were recently updated (default: false)",
             ),
+            OpenApiParameter(
+                name="async",
+                type=OpenApiTypes.BOOL,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Run the update in the background and return a task id to poll (default: false)",
+            ),
         ],
         responses={
             200: inline_serializer(
@@ -226,6 +326,14 @@ class CurrencyUpdateRatesView(APIView):
                     "updated_count": serializers.IntegerField(),
                 },
             ),
+            202: inline_serializer(
+                name="CurrencyUpdateQueuedResponse",
+                fields={
+                    "task_id": serializers.CharField(),
+                    "status": serializers.CharField(),
+                },
+            ),
+            400: OpenApiResponse(description="Async mode requested without a shared cache"),
             403: OpenApiResponse(description="Forbidden - Admin access required"),
         },
         tags=["currency"],
@@ -235,47 +343,60 @@ class CurrencyUpdateRatesView(APIView):
         api_provider = request.query_params.get('api', 'exchangerate')
         force = request.query_params.get('force', 'false').lower() == 'true'
         
-        # Capture command output
-        out = StringIO()
-        err = StringIO()
-        
-        try:
-            call_command(
-                'update_exchange_rates',
-                api=api_provider,
-                force=force,
-                stdout=out,
-                stderr=err,
+        if request.query_params.get('async', 'false').lower() not in ('1', 'true'):
+            result = run_rate_update(api_provider, force)
+            return Response(
+                result,
+                status=status.HTTP_200_OK if result['success'] else status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+        if not cache_is_shared():
+            # Another worker could not read the task status from a process-local cache
+            return Response(
+                {'error': 'Async updates need a shared cache (set REDIS_URL); retry without async.'},
+                status=status.HTTP_400_BAD_REQUEST,
             )
-            
-            output = out.getvalue()
-            error_output = err.getvalue()
-            
-            # Parse output to get updated count
-            updated_count = 0
-            if 'Successfully updated' in output:
-                try:
-                    # Extract number from "Successfully updated X currency exchange rate(s)"
-                    import re
-                    match = re.search(r'Successfully updated (\d+)', output)
-                    if match:
-                        updated_count = int(match.group(1))
-                except:
-                    pass
-            
-            return Response({
-                'success': True,
-                'message': 'Exchange rates updated successfully',
-                'updated_count': updated_count,
-                'output': output,
-            }, status=status.HTTP_200_OK)
-            
-        except Exception as e:
-            return Response({
-                'success': False,
-                'message': f'Failed to update exchange rates: {str(e)}',
-                'error': str(e),
-                'output': out.getvalue(),
-                'error_output': err.getvalue(),
-            }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+        task_id = uuid4().hex
+        cache.set(
+            rate_update_cache_key(task_id),
+            {'task_id': task_id, 'status': 'queued'},
+            RATE_UPDATE_STATUS_TIMEOUT,
+        )
+        threading.Thread(
+            target=_run_rate_update_in_background,
+            args=(task_id, api_provider, force),
+            name=f"rate-update-{task_id}",
+            daemon=True,
+        ).start()
+        return Response({'task_id': task_id, 'status': 'queued'}, status=status.HTTP_202_ACCEPTED)
+
+
+class CurrencyUpdateRatesStatusView(APIView):
+    """Status of a background exchange rate update."""
+
+    permission_classes = [IsAuthenticated, IsAdminUser]
+
+    @extend_schema(
+        summary="Exchange rate update status",
+        description="Poll a background update started by POST /currencies/update-rates.",
+        responses={
+            200: inline_serializer(
+                name="CurrencyUpdateStatusResponse",
+                fields={
+                    "task_id": serializers.CharField(),
+                    "status": serializers.CharField(),
+                    "success": serializers.BooleanField(required=False),
+                    "message": serializers.CharField(required=False),
+                    "updated_count": serializers.IntegerField(required=False),
+                },
+            ),
+            404: OpenApiResponse(description="Unknown or expired task id"),
+        },
+        tags=["currency"],
+    )
+    def get(self, request, task_id):
+        result = cache.get(rate_update_cache_key(task_id))
+        if result is None:
+            return Response({'error': 'Unknown or expired task id.'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(result)
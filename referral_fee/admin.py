@@ -3,13 +3,36 @@ Admin configuration for Referral Fee app.
 """
 
 from django.contrib import admin
+from django.contrib.admin.views.main import ChangeList
 from .models import ReferralFee
 
 
+class ReferralFeeChangeList(ChangeList):
+    """Changelist loading only the columns the list_display callbacks read."""
+
+    def get_queryset(self, request, exclude_parameters=None):
+        return super().get_queryset(request, exclude_parameters).only(
+            'id',
+            'category',
+            'subcategory',
+            'second_subcategory',
+            'category__name',
+            'subcategory__name',
+            'second_subcategory__name',
+            'fee_percentage',
+            'fee_fixed',
+            'is_active',
+            'created_at',
+        )
+
+
 @admin.register(ReferralFee)
 class ReferralFeeAdmin(admin.ModelAdmin):
     """Admin interface for ReferralFee model."""
     
+    # Skip the extra unfiltered COUNT(*) on filtered/searched changelists
+    show_full_result_count = False
+    
     list_display = [
         'fee_path',
         'fee_display',
@@ -61,6 +84,9 @@ class ReferralFeeAdmin(admin.ModelAdmin):
             'second_subcategory'
         )
     
+    def get_changelist(self, request, **kwargs):
+        return ReferralFeeChangeList
+    
     def fee_path(self, obj):
         """Display the category path for this fee"""
         parts = [obj.category.name]
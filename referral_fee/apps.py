@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ReferralFeeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'referral_fee'
+
+    def ready(self):
+        """Import signal handlers when app is ready."""
+        import referral_fee.signals  # noqa: F401
@@ -0,0 +1,41 @@
+"""
+Caching of referral fee lookups.
+
+Resolving the fee for a product walks up to three specificity tiers, and it
+runs for every order item. The resolved fee for a (category, subcategory,
+second_subcategory) combination is cached under a version token that the
+signal handlers in ``referral_fee.signals`` rotate whenever a fee or the
+catalogue structure changes, so every cached lookup is dropped at once.
+Lookups that miss are answered from an index of every active fee tier, built
+with one query and cached under the same version, as is the serialized
+payload of the fee list endpoint.
+"""
+from uuid import uuid4
+
+from django.core.cache import cache
+
+from products.cache import bounded_timeout
+
+
+FEE_CACHE_TIMEOUT = bounded_timeout(300)  # seconds; capped for process-local caches
+FEE_VERSION_KEY = "referral_fee:version"
+
+
+def _fee_version():
+    return cache.get_or_set(FEE_VERSION_KEY, uuid4().hex, None)
+
+
+def fee_cache_key(*parts):
+    """
+    Build a versioned cache key for a fee lookup.
+
+    Example:
+        fee_cache_key(3, 12, None)
+        # Returns: 'referral_fee:3:12:None:<version>'
+    """
+    return ":".join(["referral_fee", *(str(part) for part in parts), _fee_version()])
+
+
+def invalidate_fee_cache():
+    """Rotate the fee version so all cached lookups are ignored."""
+    cache.set(FEE_VERSION_KEY, uuid4().hex, None)
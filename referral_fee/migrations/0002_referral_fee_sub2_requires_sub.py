@@ -0,0 +1,21 @@
+# Generated by Django 5.2.8
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referral_fee', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='referralfee',
+            constraint=models.CheckConstraint(
+                condition=models.Q(('second_subcategory__isnull', True), ('subcategory__isnull', False), _connector='OR'),
+                name='referral_fee_sub2_requires_sub',
+                violation_error_message='Cannot set second_subcategory without first-level subcategory.',
+            ),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8
+
+from django.db import migrations, models
+
+
+def deactivate_duplicate_active_tiers(apps, schema_editor):
+    """Keep only the newest active fee per tier so the unique constraint can be added."""
+    ReferralFee = apps.get_model('referral_fee', 'ReferralFee')
+    seen = set()
+    duplicate_ids = []
+    active_fees = (
+        ReferralFee.objects.filter(is_active=True)
+        .order_by('-created_at', '-pk')
+        .values_list('pk', 'category_id', 'subcategory_id', 'second_subcategory_id')
+    )
+    for pk, *tier in active_fees:
+        tier = tuple(tier)
+        if tier in seen:
+            duplicate_ids.append(pk)
+        else:
+            seen.add(tier)
+    if duplicate_ids:
+        ReferralFee.objects.filter(pk__in=duplicate_ids).update(is_active=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('referral_fee', '0002_referral_fee_sub2_requires_sub'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='referralfee',
+            name='referral_fe_categor_ef12c2_idx',
+        ),
+        migrations.AddIndex(
+            model_name='referralfee',
+            index=models.Index(
+                condition=models.Q(('is_active', True)),
+                fields=['category', 'subcategory', 'second_subcategory'],
+                name='rf_active_tier_idx',
+            ),
+        ),
+        migrations.RunPython(deactivate_duplicate_active_tiers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='referralfee',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('is_active', True)),
+                fields=('category', 'subcategory', 'second_subcategory'),
+                name='rf_unique_active_tier',
+                nulls_distinct=False,
+                violation_error_message='An active fee already exists for this category structure.',
+            ),
+        ),
+    ]
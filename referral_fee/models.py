@@ -4,9 +4,19 @@ Fees are charged based on product category structure.
 """
 
 from django.db import models
+from django.db.models import F, Q
+from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
-from decimal import Decimal
+from django.utils.functional import cached_property
+from decimal import ROUND_HALF_UP, Decimal
+
+from .cache import FEE_CACHE_TIMEOUT, fee_cache_key
+
+
+ZERO = Decimal('0.00')
+CENT = Decimal('0.01')
+HUNDRED = Decimal('100.00')
 
 
 class ReferralFee(models.Model):
@@ -50,16 +60,16 @@ class ReferralFee(models.Model):
     fee_percentage = models.DecimalField(
         max_digits=5,
         decimal_places=2,
-        default=Decimal('0.00'),
-        validators=[MinValueValidator(Decimal('0.00')), MaxValueValidator(Decimal('100.00'))],
+        default=ZERO,
+        validators=[MinValueValidator(ZERO), MaxValueValidator(HUNDRED)],
         help_text="Fee percentage (0-100%)"
     )
     
     fee_fixed = models.DecimalField(
         max_digits=10,
         decimal_places=2,
-        default=Decimal('0.00'),
-        validators=[MinValueValidator(Decimal('0.00'))],
+        default=ZERO,
+        validators=[MinValueValidator(ZERO)],
         help_text="Fixed fee amount (in addition to percentage)"
     )
     
@@ -82,18 +92,50 @@ class ReferralFee(models.Model):
         verbose_name_plural = 'Referral Fees'
         ordering = ['category', 'subcategory', 'second_subcategory']
         indexes = [
-            models.Index(fields=['category', 'subcategory', 'second_subcategory', 'is_active']),
+            # Fee resolution only ever reads active fees
+            models.Index(
+                fields=['category', 'subcategory', 'second_subcategory'],
+                condition=Q(is_active=True),
+                name='rf_active_tier_idx',
+            ),
             models.Index(fields=['category', 'is_active']),
         ]
+        constraints = [
+            # One active fee per tier. NULL levels compare equal (nulls_distinct=False)
+            # only on PostgreSQL 15+; older PostgreSQL and SQLite enforce it just for
+            # full-depth tiers, so the serializer and model validation check
+            # category-only and subcategory-level tiers themselves.
+            models.UniqueConstraint(
+                fields=['category', 'subcategory', 'second_subcategory'],
+                condition=Q(is_active=True),
+                nulls_distinct=False,
+                name='rf_unique_active_tier',
+                violation_error_message="An active fee already exists for this category structure.",
+            ),
+            models.CheckConstraint(
+                condition=Q(second_subcategory__isnull=True) | Q(subcategory__isnull=False),
+                name='referral_fee_sub2_requires_sub',
+                violation_error_message="Cannot set second_subcategory without first-level subcategory.",
+            ),
+        ]
     
     def __str__(self):
+        return self.display_label
+    
+    @cached_property
+    def display_label(self):
+        """'Category -> Subcategory -> Second: 10.00% + 50.00', built once per instance.
+        
+        Reads the related names, so querysets rendered row by row should use
+        with_categories().
+        """
         parts = [self.category.name]
-        if self.subcategory:
+        if self.subcategory_id:
             parts.append(self.subcategory.name)
-        if self.second_subcategory:
+        if self.second_subcategory_id:
             parts.append(self.second_subcategory.name)
         fee_str = f"{self.fee_percentage}%"
-        if self.fee_fixed > 0:
+        if self.fee_fixed > ZERO:
             fee_str += f" + {self.fee_fixed}"
         return f"{' -> '.join(parts)}: {fee_str}"
     
@@ -102,36 +144,127 @@ class ReferralFee(models.Model):
         errors = {}
         
         # Category is required
-        if not self.category:
+        if not self.category_id:
             errors['category'] = "Category is required."
         
-        # If second_subcategory is set, subcategory must also be set
-        if self.second_subcategory and not self.subcategory:
-            errors['second_subcategory'] = "Cannot set second_subcategory without first-level subcategory."
+        errors.update(self._validate_structure())
         
-        # If second_subcategory is set, it must be a child of subcategory
-        if self.second_subcategory and self.subcategory:
-            if self.second_subcategory.parent_subcategory != self.subcategory:
-                errors['second_subcategory'] = "Second subcategory must be a child of the first subcategory."
+        if errors:
+            raise ValidationError(errors)
+    
+    def _validate_structure(self):
+        """Check the category levels fit together; returns a field -> message dict."""
+        loaded = [
+            getattr(self, field.name)
+            for field in (ReferralFee.subcategory.field, ReferralFee.second_subcategory.field)
+            if field.is_cached(self)
+        ]
+        return self.validate_tier(
+            self.category_id,
+            self.subcategory_id,
+            self.second_subcategory_id,
+            subcategories=[subcategory for subcategory in loaded if subcategory is not None],
+        )
+    
+    @staticmethod
+    def validate_tier(category_id, subcategory_id, second_subcategory_id, subcategories=()):
+        """
+        Check a category / subcategory / second subcategory combination.
         
-        # Ensure all subcategories belong to the same category
-        if self.subcategory and self.subcategory.category != self.category:
-            errors['subcategory'] = "Subcategory must belong to the same category."
+        Shared by model validation and the API serializer. Works from ids;
+        subcategories not passed in as already-loaded instances are fetched
+        in a single query.
         
-        if self.second_subcategory and self.second_subcategory.category != self.category:
-            errors['second_subcategory'] = "Second subcategory must belong to the same category."
+        Returns:
+            Dict mapping field name to error message (empty when valid)
+        """
+        # "second_subcategory requires subcategory" is a CHECK constraint (see Meta)
+        errors = {}
         
-        # Ensure subcategory is first-level (no parent) if set
-        if self.subcategory and self.subcategory.parent_subcategory:
-            errors['subcategory'] = "Subcategory must be a first-level subcategory (no parent)."
+        structure = {
+            subcategory.pk: (subcategory.category_id, subcategory.parent_subcategory_id)
+            for subcategory in subcategories
+        }
+        missing = [
+            pk for pk in (subcategory_id, second_subcategory_id)
+            if pk and pk not in structure
+        ]
+        if missing:
+            from products.models import Subcategory
+            structure.update(
+                (pk, (parent_category_id, parent_id))
+                for pk, parent_category_id, parent_id in Subcategory.objects.filter(pk__in=missing)
+                .values_list('pk', 'category_id', 'parent_subcategory_id')
+            )
         
-        if errors:
-            raise ValidationError(errors)
+        if second_subcategory_id in structure:
+            parent_category_id, parent_id = structure[second_subcategory_id]
+            # If second_subcategory is set, it must be a child of subcategory
+            if subcategory_id and parent_id != subcategory_id:
+                errors['second_subcategory'] = "Second subcategory must be a child of the first subcategory."
+            # Ensure all subcategories belong to the same category
+            if parent_category_id != category_id:
+                errors['second_subcategory'] = "Second subcategory must belong to the same category."
+        
+        if subcategory_id in structure:
+            parent_category_id, parent_id = structure[subcategory_id]
+            if parent_category_id != category_id:
+                errors['subcategory'] = "Subcategory must belong to the same category."
+            # Ensure subcategory is first-level (no parent) if set
+            if parent_id:
+                errors['subcategory'] = "Subcategory must be a first-level subcategory (no parent)."
+        
+        return errors
     
     def save(self, *args, **kwargs):
-        """Validate before saving"""
-        self.full_clean()
+        """Check the category structure before saving.
+        
+        Field validators and the rest of full_clean() run in the admin form and
+        the API serializer; bulk_create() skips save() and both checks.
+        """
+        errors = self._validate_structure()
+        if errors:
+            raise ValidationError(errors)
         super().save(*args, **kwargs)
+        # Values cached from the previous field values
+        for name in ('display_label', '_percentage_hundredths', '_fixed_cents'):
+            self.__dict__.pop(name, None)
+    
+    @classmethod
+    def with_categories(cls):
+        """Fees with the category levels shown by the serializers loaded in the same query."""
+        return cls.objects.select_related('category', 'subcategory', 'second_subcategory')
+    
+    @classmethod
+    def active_tier_taken(cls, category_id, subcategory_id, second_subcategory_id, exclude_pk=None):
+        """Whether another active fee already covers this exact tier (NULL levels compare equal)."""
+        duplicates = cls.objects.filter(
+            category_id=category_id,
+            subcategory_id=subcategory_id,
+            second_subcategory_id=second_subcategory_id,
+            is_active=True,
+        )
+        if exclude_pk is not None:
+            duplicates = duplicates.exclude(pk=exclude_pk)
+        return duplicates.exists()
+    
+    @classmethod
+    def list_rows(cls, include_inactive=False):
+        """Fee rows as dicts with the category level names joined in (for list endpoints)."""
+        queryset = cls.objects.all() if include_inactive else cls.objects.filter(is_active=True)
+        return queryset.values(
+            'id',
+            'category',
+            'subcategory',
+            'second_subcategory',
+            'fee_percentage',
+            'fee_fixed',
+            'is_active',
+            'created_at',
+            category_name=F('category__name'),
+            subcategory_name=F('subcategory__name'),
+            second_subcategory_name=F('second_subcategory__name'),
+        )
     
     @classmethod
     def get_fee_for_product(cls, product):
@@ -142,46 +275,108 @@ class ReferralFee(models.Model):
         2. Category + Subcategory
         3. Category only
         
+        Lookups are cached per category combination (see referral_fee.cache);
+        misses are resolved against the cached index of all active fee tiers.
+        
         Args:
             product: Product instance
             
         Returns:
             ReferralFee instance or None if no matching fee found
         """
-        if not product or not product.category:
+        if not product or not product.category_id:
             return None
         
-        # Try most specific match first: category + subcategory + second_subcategory
-        if product.second_subcategory and product.subcategory:
-            fee = cls.objects.filter(
-                category=product.category,
-                subcategory=product.subcategory,
-                second_subcategory=product.second_subcategory,
-                is_active=True
-            ).first()
-            if fee:
-                return fee
-        
-        # Try category + subcategory
-        if product.subcategory:
-            fee = cls.objects.filter(
-                category=product.category,
-                subcategory=product.subcategory,
-                second_subcategory__isnull=True,
-                is_active=True
-            ).first()
-            if fee:
-                return fee
-        
-        # Try category only
-        fee = cls.objects.filter(
-            category=product.category,
-            subcategory__isnull=True,
-            second_subcategory__isnull=True,
-            is_active=True
-        ).first()
-        
-        return fee
+        ids = (product.category_id, product.subcategory_id, product.second_subcategory_id)
+        cache_key = fee_cache_key(*ids)
+        fee = cache.get(cache_key)
+        if fee is None:
+            # False marks a cached "no matching fee"
+            fee = cls._resolve_fee(*ids) or False
+            cache.set(cache_key, fee, FEE_CACHE_TIMEOUT)
+        return fee or None
+    
+    @classmethod
+    def get_fees_for_products(cls, products):
+        """Get the most specific referral fee for each of several products.
+        
+        Batched form of get_fee_for_product for orders and carts: cached
+        lookups are read in one round trip and the remaining category
+        combinations are resolved together against the fee tier index.
+        
+        Args:
+            products: Iterable of Product instances
+            
+        Returns:
+            Dict mapping product id to ReferralFee instance or None
+        """
+        combos = {
+            product.pk: (
+                (product.category_id, product.subcategory_id, product.second_subcategory_id)
+                if product.category_id
+                else None
+            )
+            for product in products
+            if product is not None
+        }
+        cache_keys = {combo: fee_cache_key(*combo) for combo in set(combos.values()) if combo}
+        cached = cache.get_many(cache_keys.values())
+        fees = {combo: cached[key] for combo, key in cache_keys.items() if key in cached}
+        
+        missing = [combo for combo in cache_keys if combo not in fees]
+        if missing:
+            resolved = cls._resolve_fees(missing)
+            cache.set_many(
+                {cache_keys[combo]: resolved[combo] or False for combo in missing},
+                FEE_CACHE_TIMEOUT,
+            )
+            fees.update(resolved)
+        
+        return {
+            product_id: (fees[combo] or None) if combo else None
+            for product_id, combo in combos.items()
+        }
+    
+    @classmethod
+    def build_lookup_index(cls):
+        """
+        Map every active fee tier to its fee, in one query.
+        
+        Returns:
+            Dict mapping (category_id, subcategory_id, second_subcategory_id)
+            to the ReferralFee for that tier (lowest id if several)
+        """
+        index = {}
+        for fee in cls.with_categories().filter(is_active=True).order_by('pk'):
+            index.setdefault((fee.category_id, fee.subcategory_id, fee.second_subcategory_id), fee)
+        return index
+    
+    @classmethod
+    def _lookup_index(cls):
+        return cache.get_or_set(fee_cache_key('index'), cls.build_lookup_index, FEE_CACHE_TIMEOUT)
+    
+    @classmethod
+    def _resolve_fees(cls, combos):
+        """Resolve (category, subcategory, second_subcategory) id triples against the tier index."""
+        index = cls._lookup_index()
+        resolved = {}
+        for category_id, subcategory_id, second_subcategory_id in combos:
+            # Most specific first
+            levels = [(category_id, None, None)]
+            if subcategory_id:
+                levels.insert(0, (category_id, subcategory_id, None))
+                if second_subcategory_id:
+                    levels.insert(0, (category_id, subcategory_id, second_subcategory_id))
+            resolved[(category_id, subcategory_id, second_subcategory_id)] = next(
+                (index[level] for level in levels if level in index), None
+            )
+        return resolved
+    
+    @classmethod
+    def _resolve_fee(cls, category_id, subcategory_id, second_subcategory_id):
+        """Find the most specific active fee for a category combination."""
+        combo = (category_id, subcategory_id, second_subcategory_id)
+        return cls._resolve_fees([combo])[combo]
     
     def calculate_fee(self, order_amount):
         """Calculate fee amount for a given order amount.
@@ -190,8 +385,24 @@ class ReferralFee(models.Model):
             order_amount: Decimal amount of the order
             
         Returns:
-            Decimal: Total fee amount (percentage + fixed)
+            Decimal: Total fee amount (percentage + fixed), in whole cents
         """
-        percentage_fee = (order_amount * self.fee_percentage) / Decimal('100.00')
-        total_fee = percentage_fee + self.fee_fixed
-        return total_fee
+        # Integer math in cents; the percentage part is rounded half up to a cent
+        if not isinstance(order_amount, Decimal):
+            order_amount = Decimal(order_amount)
+        amount_cents = int(order_amount.quantize(CENT, rounding=ROUND_HALF_UP).scaleb(2))
+        percentage_cents, remainder = divmod(amount_cents * self._percentage_hundredths, 10000)
+        if remainder * 2 >= 10000:
+            percentage_cents += 1
+        return Decimal(percentage_cents + self._fixed_cents).scaleb(-2)
+    
+    @cached_property
+    def _percentage_hundredths(self):
+        """fee_percentage as an integer number of hundredths of a percent."""
+        # Unsaved instances may hold ints or strings assigned by callers
+        return int(Decimal(str(self.fee_percentage)).scaleb(2))
+    
+    @cached_property
+    def _fixed_cents(self):
+        """fee_fixed as an integer number of cents."""
+        return int(Decimal(str(self.fee_fixed)).scaleb(2))
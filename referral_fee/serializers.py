@@ -37,67 +37,69 @@ class ReferralFeeSerializer(serializers.ModelSerializer):
             'updated_at',
         ]
         read_only_fields = ['id', 'created_at', 'updated_at']
+        # The conditional unique constraint's auto-generated validator needs every
+        # field in the payload and skips NULL tiers; validate() checks it instead
+        validators = []
     
     def validate(self, data):
         """Validate fee configuration"""
+        # Partial updates validate against the stored values of omitted fields
+        def value(field):
+            return data[field] if field in data else getattr(self.instance, field, None)
+        
+        category = value('category')
+        subcategory = value('subcategory')
+        second_subcategory = value('second_subcategory')
+        
         # If second_subcategory is set, subcategory must also be set
-        if data.get('second_subcategory') and not data.get('subcategory'):
+        if second_subcategory and not subcategory:
             raise serializers.ValidationError({
                 'second_subcategory': 'Cannot set second_subcategory without first-level subcategory.'
             })
         
-        # If second_subcategory is set, it must be a child of subcategory
-        if data.get('second_subcategory') and data.get('subcategory'):
-            if data['second_subcategory'].parent_subcategory != data['subcategory']:
-                raise serializers.ValidationError({
-                    'second_subcategory': 'Second subcategory must be a child of the first subcategory.'
-                })
+        # Same rules as the model, checked against the already-loaded subcategories
+        errors = ReferralFee.validate_tier(
+            category.pk if category else None,
+            subcategory.pk if subcategory else None,
+            second_subcategory.pk if second_subcategory else None,
+            subcategories=[level for level in (subcategory, second_subcategory) if level],
+        )
+        if errors:
+            raise serializers.ValidationError(errors)
         
-        # Ensure all subcategories belong to the same category
-        category = data.get('category')
-        if category:
-            if data.get('subcategory') and data['subcategory'].category != category:
-                raise serializers.ValidationError({
-                    'subcategory': 'Subcategory must belong to the same category.'
-                })
-            
-            if data.get('second_subcategory') and data['second_subcategory'].category != category:
-                raise serializers.ValidationError({
-                    'second_subcategory': 'Second subcategory must belong to the same category.'
-                })
-            
-            # Ensure subcategory is first-level (no parent)
-            if data.get('subcategory') and data['subcategory'].parent_subcategory:
-                raise serializers.ValidationError({
-                    'subcategory': 'Subcategory must be a first-level subcategory (no parent).'
-                })
+        # One active fee per tier (see ReferralFee.Meta.constraints)
+        is_active = data.get('is_active', self.instance.is_active if self.instance else True)
+        if is_active and category and ReferralFee.active_tier_taken(
+            category.pk,
+            subcategory.pk if subcategory else None,
+            second_subcategory.pk if second_subcategory else None,
+            exclude_pk=self.instance.pk if self.instance else None,
+        ):
+            raise serializers.ValidationError(
+                'An active fee already exists for this category structure.'
+            )
         
         return data
 
 
-class ReferralFeeListSerializer(serializers.ModelSerializer):
-    """Simplified serializer for listing referral fees."""
+class ReferralFeeListSerializer(serializers.Serializer):
+    """Simplified serializer for listing referral fees.
     
-    category_name = serializers.CharField(source='category.name', read_only=True)
-    subcategory_name = serializers.CharField(source='subcategory.name', read_only=True, allow_null=True)
-    second_subcategory_name = serializers.CharField(source='second_subcategory.name', read_only=True, allow_null=True)
+    Serializes plain rows from ReferralFee.list_rows() rather than model
+    instances; related fields are ids, with the names joined in.
+    """
     
-    class Meta:
-        model = ReferralFee
-        fields = [
-            'id',
-            'category',
-            'category_name',
-            'subcategory',
-            'subcategory_name',
-            'second_subcategory',
-            'second_subcategory_name',
-            'fee_percentage',
-            'fee_fixed',
-            'is_active',
-            'created_at',
-        ]
-        read_only_fields = ['id', 'created_at']
+    id = serializers.IntegerField(read_only=True)
+    category = serializers.IntegerField(read_only=True)
+    category_name = serializers.CharField(read_only=True)
+    subcategory = serializers.IntegerField(read_only=True, allow_null=True)
+    subcategory_name = serializers.CharField(read_only=True, allow_null=True)
+    second_subcategory = serializers.IntegerField(read_only=True, allow_null=True)
+    second_subcategory_name = serializers.CharField(read_only=True, allow_null=True)
+    fee_percentage = serializers.DecimalField(max_digits=5, decimal_places=2, read_only=True)
+    fee_fixed = serializers.DecimalField(max_digits=10, decimal_places=2, read_only=True)
+    is_active = serializers.BooleanField(read_only=True)
+    created_at = serializers.DateTimeField(read_only=True)
 
 
 class CalculateFeeSerializer(serializers.Serializer):
@@ -112,3 +114,8 @@ class CalculateFeeSerializer(serializers.Serializer):
             raise serializers.ValidationError("Order amount must be positive.")
         return value
 
+
+class CalculateFeeBatchSerializer(serializers.Serializer):
+    """Serializer for calculating fees for several products in one request."""
+    
+    items = CalculateFeeSerializer(many=True, allow_empty=False, max_length=100)
@@ -0,0 +1,21 @@
+"""
+Signal handlers for the referral_fee app.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from products.models import Category, Subcategory
+
+from .cache import invalidate_fee_cache
+from .models import ReferralFee
+
+
+@receiver(post_save, sender=ReferralFee)
+@receiver(post_delete, sender=ReferralFee)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Subcategory)
+@receiver(post_delete, sender=Subcategory)
+def invalidate_fees_on_change(sender, **kwargs):
+    """Drop cached fee lookups when a fee or the category tree changes."""
+    invalidate_fee_cache()
@@ -3,11 +3,14 @@ Tests for ReferralFee models.
 Following TDD approach - tests first, then implementation.
 """
 
+from django.core.cache import cache
 from django.test import TestCase
 from django.core.exceptions import ValidationError
 from decimal import Decimal
-from products.models import Category, Subcategory, Currency
+from products.models import Brand, Category, Currency, Product, Subcategory
 from referral_fee.models import ReferralFee
+from stores.models import Store
+from users.models import User
 
 
 class ReferralFeeModelTest(TestCase):
@@ -55,6 +58,70 @@ class ReferralFeeModelTest(TestCase):
             slug='t-shirts',
             is_active=True,
         )
+        
+        # Shared product dependencies (fees are created per test)
+        cls.store_owner = User.objects.create(
+            phone='+996555000004',
+            full_name='Store Owner',
+            location='KG',
+            is_active=True,
+        )
+        
+        cls.store = Store.objects.create(
+            name='Test Store',
+            owner=cls.store_owner,
+            market='KG',
+            status='active',
+            is_active=True,
+        )
+        
+        cls.brand = Brand.objects.create(
+            name='Test Brand',
+            slug='test-brand',
+            is_active=True,
+        )
+        
+        cls.currency = Currency.objects.create(
+            code='KGS',
+            name='Kyrgyzstani Som',
+            symbol='сом',
+            exchange_rate=1.0,
+            is_base=True,
+            market='KG',
+        )
+    
+    def setUp(self):
+        # Fixture fees below skip save() signals, so start from an empty fee cache
+        cache.clear()
+    
+    def create_tier_fees(self):
+        """Create one active fee per tier of self.category in a single insert"""
+        return ReferralFee.objects.bulk_create([
+            ReferralFee(category=self.category, fee_percentage=Decimal('10.00')),
+            ReferralFee(category=self.category, subcategory=self.subcategory1, fee_percentage=Decimal('12.00')),
+            ReferralFee(
+                category=self.category,
+                subcategory=self.subcategory1,
+                second_subcategory=self.subcategory2,
+                fee_percentage=Decimal('15.00'),
+            ),
+        ])
+    
+    def create_product(self, slug, **levels):
+        """Create an active product in self.category with the given subcategory levels"""
+        return Product.objects.create(
+            name=slug.replace('-', ' ').title(),
+            slug=slug,
+            category=self.category,
+            store=self.store,
+            brand=self.brand,
+            currency=self.currency,
+            price=Decimal('1000.00'),
+            market='KG',
+            is_active=True,
+            in_stock=True,
+            **levels,
+        )
     
     def test_referral_fee_creation_with_category_only(self):
         """Test creating a referral fee with only category"""
@@ -126,6 +193,19 @@ class ReferralFeeModelTest(TestCase):
             )
             fee.full_clean()  # This should raise ValidationError
     
+    def test_referral_fee_second_subcategory_requires_subcategory_in_database(self):
+        """The database should reject second_subcategory without subcategory"""
+        from django.db import IntegrityError, transaction
+        
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            ReferralFee.objects.bulk_create([
+                ReferralFee(
+                    category=self.category,
+                    second_subcategory=self.subcategory2,
+                    fee_percentage=Decimal('10.00'),
+                ),
+            ])
+    
     def test_referral_fee_second_subcategory_must_be_child_of_subcategory(self):
         """Test that second_subcategory must be a child of subcategory"""
         # subcategory2 is a child of subcategory1, so this should work
@@ -151,6 +231,51 @@ class ReferralFeeModelTest(TestCase):
             )
             fee.full_clean()  # This should raise ValidationError
     
+    def test_referral_fee_save_checks_structure_in_one_query(self):
+        """save() should reject a mismatched structure using at most a single lookup"""
+        fee = ReferralFee(
+            category_id=self.category.pk,
+            subcategory_id=self.subcategory1.pk,
+            second_subcategory_id=self.subcategory3.pk,  # Wrong parent and category
+            fee_percentage=Decimal('15.00'),
+        )
+        with self.assertNumQueries(1):
+            with self.assertRaises(ValidationError) as context:
+                fee.save()
+        self.assertIn('second_subcategory', context.exception.message_dict)
+        self.assertIsNone(fee.pk)
+        
+        # Already-loaded subcategories are checked without a query
+        fee = ReferralFee(
+            category=self.category,
+            subcategory=self.subcategory1,
+            second_subcategory=self.subcategory3,
+            fee_percentage=Decimal('15.00'),
+        )
+        with self.assertNumQueries(0):
+            with self.assertRaises(ValidationError):
+                fee.save()
+    
+    def test_referral_fee_one_active_fee_per_tier(self):
+        """A second active fee for the same tier should fail validation"""
+        ReferralFee.objects.create(
+            category=self.category,
+            subcategory=self.subcategory1,
+            fee_percentage=Decimal('10.00'),
+            is_active=True,
+        )
+        duplicate = ReferralFee(
+            category=self.category,
+            subcategory=self.subcategory1,
+            fee_percentage=Decimal('12.00'),
+            is_active=True,
+        )
+        with self.assertRaises(ValidationError):
+            duplicate.full_clean()
+        
+        duplicate.is_active = False
+        duplicate.full_clean()
+    
     def test_referral_fee_fee_percentage_validation(self):
         """Test fee_percentage validation (0-100)"""
         # Valid percentage
@@ -205,200 +330,103 @@ class ReferralFeeModelTest(TestCase):
     
     def test_referral_fee_get_fee_for_product(self):
         """Test getting fee for a product based on its category structure"""
-        from products.models import Product, Brand, Currency
-        from stores.models import Store
-        from users.models import User
-        
-        # Create fee for category only
-        category_fee = ReferralFee.objects.create(
-            category=self.category,
-            fee_percentage=Decimal('10.00'),
-            fee_fixed=Decimal('0.00'),
-            is_active=True,
-        )
-        
-        # Create fee for category + subcategory
-        subcategory_fee = ReferralFee.objects.create(
-            category=self.category,
-            subcategory=self.subcategory1,
-            fee_percentage=Decimal('12.00'),
-            fee_fixed=Decimal('0.00'),
-            is_active=True,
-        )
-        
-        # Create fee for all levels
-        full_fee = ReferralFee.objects.create(
-            category=self.category,
-            subcategory=self.subcategory1,
-            second_subcategory=self.subcategory2,
-            fee_percentage=Decimal('15.00'),
-            fee_fixed=Decimal('0.00'),
-            is_active=True,
-        )
-        
-        # Create test data for products
-        store_owner = User.objects.create(
-            phone='+996555000004',
-            full_name='Store Owner',
-            location='KG',
-            is_active=True,
-        )
-        
-        store = Store.objects.create(
-            name='Test Store',
-            owner=store_owner,
-            market='KG',
-            status='active',
-            is_active=True,
-        )
-        
-        brand = Brand.objects.create(
-            name='Test Brand',
-            slug='test-brand',
-            is_active=True,
-        )
-        
-        currency = Currency.objects.create(
-            code='KGS',
-            name='Kyrgyzstani Som',
-            symbol='сом',
-            exchange_rate=1.0,
-            is_base=True,
-            market='KG',
-        )
+        # Category-only, subcategory and full-depth fees for self.category
+        category_fee, subcategory_fee, full_fee = self.create_tier_fees()
         
         # Test: Product with only category should get category_fee
-        product_category_only = Product.objects.create(
-            name='Product Category Only',
-            slug='product-category-only',
-            category=self.category,
-            store=store,
-            brand=brand,
-            currency=currency,
-            price=Decimal('1000.00'),
-            market='KG',
-            is_active=True,
-            in_stock=True,
-        )
+        product_category_only = self.create_product('product-category-only')
         
         fee = ReferralFee.get_fee_for_product(product_category_only)
         self.assertEqual(fee, category_fee)
         
         # Test: Product with category + subcategory should get subcategory_fee
-        product_with_subcategory = Product.objects.create(
-            name='Product With Subcategory',
-            slug='product-with-subcategory',
-            category=self.category,
-            subcategory=self.subcategory1,
-            store=store,
-            brand=brand,
-            currency=currency,
-            price=Decimal('1000.00'),
-            market='KG',
-            is_active=True,
-            in_stock=True,
-        )
+        product_with_subcategory = self.create_product('product-with-subcategory', subcategory=self.subcategory1)
         
         fee = ReferralFee.get_fee_for_product(product_with_subcategory)
         self.assertEqual(fee, subcategory_fee)
         
         # Test: Product with all levels should get full_fee (most specific)
-        product_full = Product.objects.create(
-            name='Product Full',
-            slug='product-full',
-            category=self.category,
-            subcategory=self.subcategory1,
-            second_subcategory=self.subcategory2,
-            store=store,
-            brand=brand,
-            currency=currency,
-            price=Decimal('1000.00'),
-            market='KG',
-            is_active=True,
-            in_stock=True,
-        )
+        product_full = self.create_product('product-full', subcategory=self.subcategory1, second_subcategory=self.subcategory2)
         
         fee = ReferralFee.get_fee_for_product(product_full)
         self.assertEqual(fee, full_fee)
     
-    def test_referral_fee_most_specific_takes_precedence(self):
-        """Test that more specific fees (with more levels) take precedence"""
-        from products.models import Product, Brand, Currency
-        from stores.models import Store
-        from users.models import User
+    def test_get_fee_for_product_is_cached_until_fees_change(self):
+        """Fee lookups should be served from cache until a fee is saved"""
+        fee = ReferralFee.objects.create(
+            category=self.category2,
+            fee_percentage=Decimal('10.00'),
+            is_active=True,
+        )
+        product = Product(category=self.category2)
+        
+        self.assertEqual(ReferralFee.get_fee_for_product(product), fee)
+        with self.assertNumQueries(0):
+            self.assertEqual(ReferralFee.get_fee_for_product(product), fee)
+        
+        fee.fee_percentage = Decimal('11.00')
+        fee.save()
+        self.assertEqual(
+            ReferralFee.get_fee_for_product(product).fee_percentage, Decimal('11.00')
+        )
         
-        # Create fees at different levels
+        fee.delete()
+        self.assertIsNone(ReferralFee.get_fee_for_product(product))
+    
+    def test_get_fees_for_products_matches_single_lookups(self):
+        """Batched fee lookup should pick the same fee per product in one query"""
         category_fee = ReferralFee.objects.create(
             category=self.category,
             fee_percentage=Decimal('10.00'),
-            fee_fixed=Decimal('0.00'),
             is_active=True,
         )
-        
         subcategory_fee = ReferralFee.objects.create(
             category=self.category,
             subcategory=self.subcategory1,
             fee_percentage=Decimal('12.00'),
-            fee_fixed=Decimal('0.00'),
-            is_active=True,
-        )
-        
-        full_fee = ReferralFee.objects.create(
-            category=self.category,
-            subcategory=self.subcategory1,
-            second_subcategory=self.subcategory2,
-            fee_percentage=Decimal('15.00'),
-            fee_fixed=Decimal('0.00'),
-            is_active=True,
-        )
-        
-        # Create test data
-        store_owner = User.objects.create(
-            phone='+996555000005',
-            full_name='Store Owner',
-            location='KG',
-            is_active=True,
-        )
-        
-        store = Store.objects.create(
-            name='Test Store',
-            owner=store_owner,
-            market='KG',
-            status='active',
-            is_active=True,
-        )
-        
-        brand = Brand.objects.create(
-            name='Test Brand',
-            slug='test-brand',
             is_active=True,
         )
+        products = [
+            Product(pk=1, category=self.category),
+            Product(pk=2, category=self.category, subcategory=self.subcategory1),
+            Product(pk=3, category=self.category, subcategory=self.subcategory1,
+                    second_subcategory=self.subcategory2),
+            Product(pk=4, category=self.category2),
+        ]
+        
+        with self.assertNumQueries(1):
+            fees = ReferralFee.get_fees_for_products(products)
+        self.assertEqual(fees, {1: category_fee, 2: subcategory_fee, 3: subcategory_fee, 4: None})
+        
+        # Results are shared with the single-product cache
+        with self.assertNumQueries(0):
+            self.assertEqual(ReferralFee.get_fee_for_product(products[2]), subcategory_fee)
+            self.assertEqual(ReferralFee.get_fees_for_products(products), fees)
+    
+    def test_fee_lookups_share_one_tier_index(self):
+        """Different category combinations should be resolved from one index query"""
+        category_fee, subcategory_fee, full_fee = self.create_tier_fees()
         
-        currency = Currency.objects.create(
-            code='KGS',
-            name='Kyrgyzstani Som',
-            symbol='сом',
-            exchange_rate=1.0,
-            is_base=True,
-            market='KG',
-        )
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                ReferralFee.get_fee_for_product(Product(category=self.category)), category_fee
+            )
+            self.assertEqual(
+                ReferralFee.get_fee_for_product(
+                    Product(category=self.category, subcategory=self.subcategory1)
+                ),
+                subcategory_fee,
+            )
+            self.assertIsNone(ReferralFee.get_fee_for_product(Product(category=self.category2)))
+    
+    def test_referral_fee_most_specific_takes_precedence(self):
+        """Test that more specific fees (with more levels) take precedence"""
+        # Category-only, subcategory and full-depth fees for self.category
+        category_fee, subcategory_fee, full_fee = self.create_tier_fees()
         
         # For a product with category, subcategory, and second_subcategory,
         # the most specific fee (full_fee) should be used
-        product = Product.objects.create(
-            name='Product Full',
-            slug='product-full-prec',
-            category=self.category,
-            subcategory=self.subcategory1,
-            second_subcategory=self.subcategory2,
-            store=store,
-            brand=brand,
-            currency=currency,
-            price=Decimal('1000.00'),
-            market='KG',
-            is_active=True,
-            in_stock=True,
-        )
+        product = self.create_product('product-full-prec', subcategory=self.subcategory1, second_subcategory=self.subcategory2)
         
         fee = ReferralFee.get_fee_for_product(product)
         self.assertEqual(fee, full_fee)  # Most specific should win
@@ -432,14 +460,50 @@ class ReferralFeeModelTest(TestCase):
         calculated_fee2 = fee2.calculate_fee(order_amount)
         self.assertEqual(calculated_fee2, Decimal('150.00'))  # 15% of 1000
         
-        # Test with only fixed
+        # Test with only fixed (inactive: fee2 is already the active fee for category2)
         fee3 = ReferralFee.objects.create(
             category=self.category2,
             fee_percentage=Decimal('0.00'),
             fee_fixed=Decimal('200.00'),
-            is_active=True,
+            is_active=False,
         )
         
         calculated_fee3 = fee3.calculate_fee(order_amount)
         self.assertEqual(calculated_fee3, Decimal('200.00'))
+    
+    def test_referral_fee_str_uses_loaded_categories(self):
+        """str() should not query with categories loaded and should follow saved changes"""
+        ReferralFee.objects.create(
+            category=self.category,
+            subcategory=self.subcategory1,
+            fee_percentage=Decimal('12.00'),
+            fee_fixed=Decimal('5.00'),
+        )
+        fee = ReferralFee.with_categories().get()
+        with self.assertNumQueries(0):
+            self.assertEqual(str(fee), 'Electronics -> Smartphones: 12.00% + 5.00')
+        
+        fee.fee_fixed = Decimal('0.00')
+        fee.save()
+        self.assertEqual(str(fee), 'Electronics -> Smartphones: 12.00%')
+    
+    def test_referral_fee_calculate_fee_accepts_non_decimal_values(self):
+        """Fees created with int or str values should calculate like Decimals"""
+        fee = ReferralFee.objects.create(category=self.category, fee_percentage=5, fee_fixed=1)
+        self.assertEqual(fee.calculate_fee(Decimal('100')), Decimal('6.00'))
+        
+        fee = ReferralFee(category=self.category, fee_percentage='12.5', fee_fixed='0.25')
+        self.assertEqual(fee.calculate_fee(200), Decimal('25.25'))
+    
+    def test_referral_fee_calculate_fee_rounds_to_cents(self):
+        """Percentage part should be rounded half up to whole cents"""
+        fee = ReferralFee(
+            category=self.category,
+            fee_percentage=Decimal('15.00'),
+            fee_fixed=Decimal('0.10'),
+        )
+        # 15% of 33.33 = 4.9995
+        self.assertEqual(str(fee.calculate_fee(Decimal('33.33'))), '5.10')
+        # 15% of 10.01 = 1.5015
+        self.assertEqual(str(fee.calculate_fee(Decimal('10.01'))), '1.60')
 
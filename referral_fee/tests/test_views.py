@@ -3,6 +3,7 @@ Tests for Referral Fee views.
 Following TDD approach - tests first, then implementation.
 """
 
+from django.core.cache import cache
 from django.test import TestCase
 from decimal import Decimal
 from rest_framework import status
@@ -124,6 +125,7 @@ class ReferralFeeViewTests(TestCase):
     def setUp(self):
         """Set up test client"""
         self.client = APIClient()
+        cache.clear()
     
     def test_fee_list_requires_authentication(self):
         """Test that fee list requires authentication"""
@@ -154,6 +156,32 @@ class ReferralFeeViewTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(len(response.data['fees']), 3)
     
+    def test_fee_list_loads_categories_in_one_query(self):
+        """Category names should not be fetched per fee"""
+        self.client.force_authenticate(user=self.regular_user)
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/v1/referral-fees/')
+        self.assertEqual(response.data['total'], 2)
+        self.assertEqual(
+            {fee['subcategory_name'] for fee in response.data['fees']},
+            {None, self.subcategory1.name},
+        )
+    
+    def test_fee_list_is_cached_until_fees_change(self):
+        """The fee list should be served from cache until a fee changes"""
+        self.client.force_authenticate(user=self.regular_user)
+        self.client.get('/api/v1/referral-fees/')
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/v1/referral-fees/')
+        self.assertEqual(response.data['total'], 2)
+        
+        self.fee_category.is_active = False
+        self.fee_category.save()
+        response = self.client.get('/api/v1/referral-fees/')
+        self.assertEqual(response.data['total'], 1)
+        response = self.client.get('/api/v1/referral-fees/?include_inactive=true')
+        self.assertEqual(response.data['total'], 2)
+    
     def test_fee_detail_success(self):
         """Test getting fee detail"""
         self.client.force_authenticate(user=self.regular_user)
@@ -176,8 +204,10 @@ class ReferralFeeViewTests(TestCase):
     def test_fee_create_success(self):
         """Test creating a fee as admin"""
         self.client.force_authenticate(user=self.admin_user)
+        # Subcategory-level tier: the category-only tier already has an active fee
         response = self.client.post('/api/v1/referral-fees/create/', {
             'category': self.category.id,
+            'subcategory': self.subcategory1.id,
             'fee_percentage': '12.00',
             'fee_fixed': '0.00',
             'is_active': True,
@@ -186,6 +216,48 @@ class ReferralFeeViewTests(TestCase):
         self.assertTrue(response.data['success'])
         self.assertEqual(response.data['fee']['fee_percentage'], '12.00')
     
+    def test_fee_create_rejects_duplicate_active_tier(self):
+        """A second active category-only fee should be a validation error"""
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.post('/api/v1/referral-fees/create/', {
+            'category': self.category.id,
+            'fee_percentage': '12.00',
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ReferralFee.objects.filter(category=self.category, subcategory=None, is_active=True).count(), 1)
+        
+        # An inactive fee for the same tier is allowed
+        response = self.client.post('/api/v1/referral-fees/create/', {
+            'category': self.category.id,
+            'fee_percentage': '12.00',
+            'is_active': False,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+    
+    def test_fee_partial_update_without_is_active(self):
+        """PATCH with only some fields should validate against the stored values"""
+        self.client.force_authenticate(user=self.admin_user)
+        response = self.client.patch(
+            f'/api/v1/referral-fees/{self.fee_category.id}/update/',
+            {'fee_percentage': '7.50'},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['fee']['fee_percentage'], '7.50')
+        
+        # Reactivating into a taken tier is rejected
+        inactive = ReferralFee.objects.create(
+            category=self.category,
+            fee_percentage=Decimal('5.00'),
+            is_active=False,
+        )
+        response = self.client.patch(
+            f'/api/v1/referral-fees/{inactive.id}/update/',
+            {'is_active': True},
+            format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+    
     def test_get_fee_for_product_success(self):
         """Test getting fee for a product"""
         self.client.force_authenticate(user=self.regular_user)
@@ -207,4 +279,28 @@ class ReferralFeeViewTests(TestCase):
         # 15% of 1000 = 150, plus 50 fixed = 200
         self.assertEqual(response.data['fee_amount'], '200.00')
         self.assertEqual(response.data['order_amount'], '1000.00')
+    
+    def test_calculate_fee_batch(self):
+        """Test calculating fees for several items in one request"""
+        self.client.force_authenticate(user=self.regular_user)
+        response = self.client.post('/api/v1/referral-fees/calculate-batch/', {
+            'items': [
+                {'product_id': self.product.id, 'order_amount': '1000.00'},
+                {'product_id': self.product.id, 'order_amount': '100.00'},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # 15% + 50 fixed: 200.00 and 65.00
+        self.assertEqual(
+            [result['fee_amount'] for result in response.data['results']],
+            ['200.00', '65.00'],
+        )
+        self.assertEqual(response.data['results'][0]['fee_id'], self.fee_full.id)
+        self.assertEqual(response.data['total_fee_amount'], '265.00')
+        
+        response = self.client.post('/api/v1/referral-fees/calculate-batch/', {
+            'items': [{'product_id': 999999, 'order_amount': '10.00'}],
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data['product_ids'], [999999])
 
@@ -13,6 +13,7 @@ urlpatterns = [
     path('<int:fee_id>/', views.fee_detail, name='fee-detail'),
     path('<int:fee_id>/update/', views.fee_update, name='fee-update'),
     path('calculate/', views.calculate_fee, name='calculate-fee'),
+    path('calculate-batch/', views.calculate_fee_batch, name='calculate-fee-batch'),
     path('product/<int:product_id>/', views.get_fee_for_product, name='get-fee-for-product'),
 ]
 
@@ -6,20 +6,26 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from django.core.cache import cache
 from django.shortcuts import get_object_or_404
-from decimal import Decimal
 
-from .models import ReferralFee
+from .cache import FEE_CACHE_TIMEOUT, fee_cache_key
+from .models import ZERO, ReferralFee
 from .serializers import (
     ReferralFeeSerializer,
     ReferralFeeListSerializer,
     CalculateFeeSerializer,
+    CalculateFeeBatchSerializer,
 )
 from products.models import Product
 from drf_spectacular.utils import extend_schema, OpenApiResponse, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
 
 
+# ReferralFee.get_fee_for_product() only reads the category ids, not the related rows
+FEE_LOOKUP_PRODUCT_FIELDS = ('id', 'category_id', 'subcategory_id', 'second_subcategory_id')
+
+
 @extend_schema(
     summary="List all referral fees",
     description="Get a list of all referral fee configurations",
@@ -38,20 +44,19 @@ def fee_list(request):
     """
     include_inactive = request.query_params.get('include_inactive', 'false').lower() == 'true'
     
-    queryset = ReferralFee.objects.select_related(
-        'category',
-        'subcategory',
-        'second_subcategory'
-    ).all()
-    
-    if not include_inactive:
-        queryset = queryset.filter(is_active=True)
+    def serialize_fees():
+        # Stream rows in chunks rather than holding the queryset's result cache too
+        rows = ReferralFee.list_rows(include_inactive).iterator(chunk_size=500)
+        return list(ReferralFeeListSerializer(rows, many=True).data)
     
-    serializer = ReferralFeeListSerializer(queryset, many=True)
+    # Fees change rarely; the key version rotates on every fee change
+    fees = cache.get_or_set(
+        fee_cache_key('list', include_inactive), serialize_fees, FEE_CACHE_TIMEOUT
+    )
     return Response({
         'success': True,
-        'fees': serializer.data,
-        'total': queryset.count(),
+        'fees': fees,
+        'total': len(fees),
     }, status=status.HTTP_200_OK)
 
 
@@ -68,7 +73,7 @@ def fee_list(request):
 @permission_classes([IsAuthenticated])
 def fee_detail(request, fee_id):
     """Get detailed information about a specific referral fee."""
-    fee = get_object_or_404(ReferralFee, id=fee_id)
+    fee = get_object_or_404(ReferralFee.with_categories(), id=fee_id)
     serializer = ReferralFeeSerializer(fee)
     return Response({
         'success': True,
@@ -93,10 +98,10 @@ def fee_create(request):
     """Create a new referral fee configuration."""
     serializer = ReferralFeeSerializer(data=request.data)
     if serializer.is_valid():
-        fee = serializer.save()
+        serializer.save()
         return Response({
             'success': True,
-            'fee': ReferralFeeSerializer(fee).data,
+            'fee': serializer.data,
         }, status=status.HTTP_201_CREATED)
     return Response({
         'success': False,
@@ -120,13 +125,13 @@ def fee_create(request):
 @permission_classes([IsAdminUser])
 def fee_update(request, fee_id):
     """Update an existing referral fee configuration."""
-    fee = get_object_or_404(ReferralFee, id=fee_id)
+    fee = get_object_or_404(ReferralFee.with_categories(), id=fee_id)
     serializer = ReferralFeeSerializer(fee, data=request.data, partial=True)
     if serializer.is_valid():
-        updated_fee = serializer.save()
+        serializer.save()
         return Response({
             'success': True,
-            'fee': ReferralFeeSerializer(updated_fee).data,
+            'fee': serializer.data,
         }, status=status.HTTP_200_OK)
     return Response({
         'success': False,
@@ -167,11 +172,7 @@ def calculate_fee(request):
     order_amount = serializer.validated_data['order_amount']
     
     try:
-        product = Product.objects.select_related(
-            'category',
-            'subcategory',
-            'second_subcategory'
-        ).get(id=product_id)
+        product = Product.objects.only(*FEE_LOOKUP_PRODUCT_FIELDS).get(id=product_id)
     except Product.DoesNotExist:
         return Response({
             'success': False,
@@ -185,7 +186,7 @@ def calculate_fee(request):
         return Response({
             'success': True,
             'fee': None,
-            'fee_amount': Decimal('0.00'),
+            'fee_amount': ZERO,
             'order_amount': order_amount,
             'message': 'No fee configuration found for this product',
         }, status=status.HTTP_200_OK)
@@ -203,6 +204,73 @@ def calculate_fee(request):
     }, status=status.HTTP_200_OK)
 
 
+@extend_schema(
+    summary="Calculate fees for several products",
+    description="Calculate referral fees for up to 100 (product, order amount) pairs in one request",
+    request=CalculateFeeBatchSerializer,
+    responses={
+        200: OpenApiResponse(description="Fee calculation results, in request order"),
+        400: OpenApiResponse(description="Validation error"),
+        404: OpenApiResponse(description="One or more products not found"),
+    },
+    tags=["referral-fee"],
+)
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def calculate_fee_batch(request):
+    """
+    Calculate referral fees for several products at once.
+    
+    Products are loaded in one query and their fees resolved together, so a
+    cart needs one request instead of one per item.
+    
+    Returns:
+    - results: fee_id, fee_amount, fee_percentage and fee_fixed per item
+    - total_fee_amount: Sum of the calculated fees
+    """
+    serializer = CalculateFeeBatchSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response({
+            'success': False,
+            'errors': serializer.errors,
+        }, status=status.HTTP_400_BAD_REQUEST)
+    
+    items = serializer.validated_data['items']
+    product_ids = {item['product_id'] for item in items}
+    products = Product.objects.only(*FEE_LOOKUP_PRODUCT_FIELDS).in_bulk(product_ids)
+    
+    missing = sorted(product_ids - products.keys())
+    if missing:
+        return Response({
+            'success': False,
+            'error': 'Product not found',
+            'product_ids': missing,
+        }, status=status.HTTP_404_NOT_FOUND)
+    
+    fees = ReferralFee.get_fees_for_products(products.values())
+    
+    results = []
+    total_fee_amount = ZERO
+    for item in items:
+        fee = fees[item['product_id']]
+        fee_amount = fee.calculate_fee(item['order_amount']) if fee else ZERO
+        total_fee_amount += fee_amount
+        results.append({
+            'product_id': item['product_id'],
+            'order_amount': str(item['order_amount']),
+            'fee_id': fee.id if fee else None,
+            'fee_amount': str(fee_amount),
+            'fee_percentage': str(fee.fee_percentage) if fee else None,
+            'fee_fixed': str(fee.fee_fixed) if fee else None,
+        })
+    
+    return Response({
+        'success': True,
+        'results': results,
+        'total_fee_amount': str(total_fee_amount),
+    }, status=status.HTTP_200_OK)
+
+
 @extend_schema(
     summary="Get fee for product",
     description="Get the referral fee configuration for a specific product",
@@ -221,11 +289,7 @@ def get_fee_for_product(request, product_id):
     Returns the most specific fee that matches the product's category structure.
     """
     try:
-        product = Product.objects.select_related(
-            'category',
-            'subcategory',
-            'second_subcategory'
-        ).get(id=product_id)
+        product = Product.objects.only(*FEE_LOOKUP_PRODUCT_FIELDS).get(id=product_id)
     except Product.DoesNotExist:
         return Response({
             'success': False,